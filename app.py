@@ -1,5 +1,73 @@
-from app import create_app
-from app.extensions import socketio
+"""Application entry point.
+
+Development (default)::
+
+    python app.py
+
+Production: an eventlet or gevent server, no debugger, tuned DB/Redis pools
+(see DB_* and REDIS_* in app/config.py) and a startup self-check that
+refuses to serve if the database or Redis is unreachable::
+
+    SERVER_MODE=production ASYNC_MODE=eventlet JWT_SECRET_KEY=... python app.py
+
+or under gunicorn (one worker per process, async worker class)::
+
+    ASYNC_MODE=eventlet gunicorn -k eventlet -w 1 -b 0.0.0.0:5001 app:app
+
+Running more than one worker
+----------------------------
+Socket.IO rooms live in each process, so several workers must share a
+message queue and the load balancer must keep each client on one worker
+(sticky sessions, e.g. nginx ``ip_hash``)::
+
+    export SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0
+    export TRUSTED_PROXY_HOPS=1
+    export SERVER_MODE=production ASYNC_MODE=eventlet JWT_SECRET_KEY=...
+    PORT=5001 python app.py
+    PORT=5002 python app.py
+
+Every request then arrives from the load balancer's address, so
+TRUSTED_PROXY_HOPS names how many proxies' X-Forwarded-For to trust;
+without it the per-IP rate limits count the whole site as one caller.
+Only set it when the proxy overwrites that header.
+
+Workers run in production mode: development mode starts the debugger and
+reloader, which must never face real traffic.
+
+Any emit (send_message, start_chat, strategy broadcasts) is then published
+on Redis and delivered by whichever worker holds the recipient's socket.
+"""
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Green threads must be patched in before anything opens a socket
+ASYNC_MODE = os.getenv("ASYNC_MODE", "threading")
+if ASYNC_MODE == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
+from app import create_app  # noqa: E402
+from app.extensions import socketio  # noqa: E402
+from app.runtime import self_check  # noqa: E402
+
 app = create_app()
+
 if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", port=5001, debug=True)
\ No newline at end of file
+    port = int(os.getenv("PORT", 5001))
+
+    if app.config["SERVER_MODE"] == "production":
+        results = self_check(app)
+        for name, ok, detail in results:
+            print(f"{'✅' if ok else '❌'} {name}: {detail}")
+        if not all(ok for _, ok, _ in results):
+            sys.exit("❌ Startup self-check failed")
+
+        socketio.run(app, host="0.0.0.0", port=port)
+    else:
+        socketio.run(app, host="0.0.0.0", port=port, debug=True)
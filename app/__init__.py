@@ -1,22 +1,33 @@
 
 
 
+import time
 from flask import Flask, request
 from flask_cors import CORS
-from .extensions import db, socketio
-from .routes.auth_routes import auth_bp
-from .routes.strategy import strategy_bp
-from .routes.chat_routes import chat_bp
-import app.routes.websocket_handlers  # registers socket events
 from .config import Config
 
 
 def create_app():
-   
-    
+    # Startup phase timings, reported once create_app() is done
+    timings = {}
+    phase_started = time.perf_counter()
+
+    def phase(name):
+        nonlocal phase_started
+        now = time.perf_counter()
+        timings[name] = round((now - phase_started) * 1000, 2)
+        phase_started = now
+
+    # Heavy modules are imported here rather than at package import, so
+    # `import app` (config, CLI tooling) stays cheap
+    from .extensions import db, socketio
+    from .metrics import init_metrics
+    from .utils.json_provider import configure_json, socketio_serializer_options
+    phase("import_extensions")
 
     app = Flask(__name__, template_folder="templates")
     app.config.from_object(Config)
+    configure_json(app)
     # ---------------------------
     # CORS
     # ---------------------------
@@ -30,25 +41,65 @@ def create_app():
         if request.method == "OPTIONS":
             return "", 200
 
+    phase("app")
+
     # ---------------------------
     # Initialize extensions
     # ---------------------------
+    from .routes import websocket_handlers  # noqa: F401 (registers socket events)
+    phase("import_socket_handlers")
+
     db.init_app(app)
-    socketio.init_app(app, cors_allowed_origins=["*"])
+    init_metrics(app)
+    socketio.init_app(
+        app,
+        cors_allowed_origins=["*"],
+        message_queue=app.config["SOCKETIO_MESSAGE_QUEUE"],
+        async_mode=app.config["ASYNC_MODE"],
+        **socketio_serializer_options(app.config)
+    )
+
+    # Outermost, so Socket.IO connections see the client address too
+    hops = app.config["TRUSTED_PROXY_HOPS"]
+    if hops:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+    phase("init_extensions")
 
     # ---------------------------
     # Register Blueprints
     # ---------------------------
+    from .routes.auth_routes import auth_bp
+    from .routes.strategy import strategy_bp
+    from .routes.chat_routes import chat_bp
+    from .routes.batch_routes import batch_bp
+
     app.register_blueprint(auth_bp)
     app.register_blueprint(strategy_bp, url_prefix="/strategy")
     app.register_blueprint(chat_bp, url_prefix="/chat")
- # ✅ now safe
+    app.register_blueprint(batch_bp)
+    phase("blueprints")
 
     # ---------------------------
-    # Create Tables
+    # CLI commands
+    # ---------------------------
+    from .commands import register_commands
+    register_commands(app)
+    phase("cli")
+
     # ---------------------------
-    with app.app_context():
-        db.create_all()
-        print("✅ Tables created successfully")
+    # Create Tables (opt-in: `flask create-tables` or AUTO_CREATE_TABLES=1)
+    # ---------------------------
+    if app.config["AUTO_CREATE_TABLES"]:
+        from . import migrations
+        with app.app_context():
+            migrations.create_schema()
+            print("✅ Tables created successfully")
+        phase("create_all")
+
+    timings["total"] = round(sum(timings.values()), 2)
+    app.config["STARTUP_TIMINGS"] = timings
+    if app.config["LOG_STARTUP_TIMINGS"]:
+        print("⏱ Startup (ms): " + ", ".join(f"{k}={v}" for k, v in timings.items()))
 
     return app
@@ -0,0 +1,197 @@
+# app/commands.py
+import click
+from datetime import datetime, timedelta
+from flask.cli import with_appcontext
+from sqlalchemy import func
+from app import migrations
+from app.extensions import db
+from app.runtime import self_check
+from app.models import Chat, Message, User
+from app.services.archive_service import archive_messages, archive_stats
+from app.services.message_service import LAST_MESSAGE_PREVIEW_LENGTH
+from app.services.search_service import rebuild_index
+from app.services.unread_service import rebuild_unread_counts
+from app.utils.query_plans import check_hot_queries
+
+
+def register_commands(app):
+    app.cli.add_command(create_tables)
+    app.cli.add_command(backfill_last_message)
+    app.cli.add_command(rebuild_unread)
+    app.cli.add_command(rebuild_search_index)
+    app.cli.add_command(archive_messages_command)
+    app.cli.add_command(db_upgrade)
+    app.cli.add_command(db_status)
+    app.cli.add_command(check_indexes)
+    app.cli.add_command(self_check_command)
+
+
+# -------------------------------------------------
+# CREATE TABLES (no longer done on every boot)
+# -------------------------------------------------
+@click.command("create-tables")
+@with_appcontext
+def create_tables():
+    """Create missing tables, then apply pending migrations."""
+    migrations.create_schema()
+    click.echo("✅ Tables created successfully")
+    migrations.upgrade(log=click.echo)
+
+
+# -------------------------------------------------
+# BACKFILL Chat.last_message_* FOR EXISTING DATA
+# -------------------------------------------------
+@click.command("backfill-last-message")
+@click.option("--batch-size", default=500, show_default=True)
+@with_appcontext
+def backfill_last_message(batch_size):
+    """Point every chat at its newest message (flask backfill-last-message)."""
+    latest = (
+        db.session.query(
+            Message.chat_id,
+            func.max(Message.id).label("message_id")
+        )
+        .group_by(Message.chat_id)
+        .subquery()
+    )
+
+    rows = (
+        db.session.query(
+            Message.chat_id,
+            Message.id,
+            Message.sender_id,
+            Message.content,
+            Chat.updated_at
+        )
+        .join(latest, Message.id == latest.c.message_id)
+        .join(Chat, Chat.id == Message.chat_id)
+        .all()
+    )
+
+    updated = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        db.session.bulk_update_mappings(Chat, [{
+            "id": chat_id,
+            "last_message_id": message_id,
+            "last_message_sender_id": sender_id,
+            "last_message_preview": content[:LAST_MESSAGE_PREVIEW_LENGTH],
+            # keep inbox ordering: don't let onupdate bump updated_at
+            "updated_at": updated_at
+        } for chat_id, message_id, sender_id, content, updated_at in batch])
+        db.session.commit()
+        updated += len(batch)
+
+    click.echo(f"✅ Backfilled last message for {updated} chats")
+
+
+# -------------------------------------------------
+# REBUILD REDIS UNREAD COUNTERS FROM THE DB
+# -------------------------------------------------
+@click.command("rebuild-unread")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user.")
+@with_appcontext
+def rebuild_unread(user_id):
+    """Recompute unread:{user_id} hashes, e.g. after Redis data loss."""
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = [uid for (uid,) in db.session.query(User.id).all()]
+
+    for uid in user_ids:
+        rebuild_unread_counts(uid)
+
+    click.echo(f"✅ Rebuilt unread counters for {len(user_ids)} users")
+
+
+# -------------------------------------------------
+# REBUILD THE MESSAGE SEARCH INDEX
+# -------------------------------------------------
+@click.command("rebuild-search-index")
+@click.option("--batch-size", default=1000, show_default=True)
+@with_appcontext
+def rebuild_search_index(batch_size):
+    """Re-index all messages for GET /chat/search."""
+    indexed = rebuild_index(batch_size=batch_size, log=click.echo)
+    click.echo(f"✅ Indexed {indexed} messages for search")
+
+
+# -------------------------------------------------
+# MOVE OLD MESSAGES TO THE COMPRESSED ARCHIVE
+# -------------------------------------------------
+@click.command("archive-messages")
+@click.option("--days", type=int, default=None, help="Defaults to ARCHIVE_AFTER_DAYS.")
+@click.option("--block-size", type=int, default=None, help="Defaults to ARCHIVE_BLOCK_SIZE.")
+@with_appcontext
+def archive_messages_command(days, block_size):
+    """Archive read messages older than --days (run from cron)."""
+    from flask import current_app
+
+    days = current_app.config["ARCHIVE_AFTER_DAYS"] if days is None else days
+    block_size = block_size or current_app.config["ARCHIVE_BLOCK_SIZE"]
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    chats, archived = archive_messages(cutoff, block_size, log=click.echo)
+    blocks, stored, size = archive_stats()
+    click.echo(f"✅ Archived {archived} messages from {chats} chats")
+    click.echo(f"   archive: {stored} messages in {blocks} blocks, {size} bytes")
+
+
+# -------------------------------------------------
+# SCHEMA MIGRATIONS
+# -------------------------------------------------
+@click.command("db-upgrade")
+@with_appcontext
+def db_upgrade():
+    """Apply pending schema migrations (app/migrations.py)."""
+    applied = migrations.upgrade(log=click.echo)
+    if not applied:
+        click.echo("✅ Schema is up to date")
+
+
+@click.command("db-status")
+@with_appcontext
+def db_status():
+    """List schema migrations and whether each is applied."""
+    done = migrations.applied_versions()
+    for version, description, _ in migrations.MIGRATIONS:
+        mark = "applied" if version in done else "pending"
+        click.echo(f"{version:>4}  {mark:<8} {description}")
+
+
+# -------------------------------------------------
+# EXPLAIN CHECK FOR HOT QUERIES
+# -------------------------------------------------
+@click.command("check-indexes")
+@with_appcontext
+def check_indexes():
+    """Fail if any route's main query plan is a full table scan."""
+    failed = False
+    for route, uses_index, plan in check_hot_queries():
+        if uses_index is None:
+            click.echo(f"⚠️ {route}: {plan[0]}")
+            continue
+        click.echo(f"{'✅' if uses_index else '❌'} {route}")
+        for line in plan:
+            click.echo(f"      {line}")
+        failed = failed or not uses_index
+
+    if failed:
+        raise click.ClickException("Some hot queries do not use an index")
+
+
+# -------------------------------------------------
+# STARTUP SELF-CHECK
+# -------------------------------------------------
+@click.command("self-check")
+@with_appcontext
+def self_check_command():
+    """Check DB, Redis and runtime settings the way app.py does at startup."""
+    from flask import current_app
+
+    results = self_check(current_app)
+    for name, ok, detail in results:
+        click.echo(f"{'✅' if ok else '❌'} {name}: {detail}")
+
+    if not all(ok for _, ok, _ in results):
+        raise click.ClickException("Self-check failed")
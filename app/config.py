@@ -5,7 +5,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
-    SECRET_KEY = "jwt-secret-key-123"   
+    # JWT_SECRET_KEY rather than SECRET_KEY: .env already sets the latter,
+    # and honouring it would silently invalidate every issued token
+    SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret-key-123")
 
     SQLALCHEMY_DATABASE_URI = os.getenv(
         "DATABASE_URI",
@@ -13,13 +15,145 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
-    REDIS_HOST = "localhost"
-    REDIS_PORT = 6379
-    REDIS_DB = 0
+    # "development" runs the Werkzeug server with the reloader; "production"
+    # needs ASYNC_MODE=eventlet or gevent and runs the startup self-check
+    SERVER_MODE = os.getenv("SERVER_MODE", "development")
+    ASYNC_MODE = os.getenv("ASYNC_MODE", "threading")
+
+    # create_all() inspects every table on boot; leave it to
+    # `flask create-tables` unless explicitly asked for
+    AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES", "0") == "1"
+    # print the create_app() phase breakdown (always in STARTUP_TIMINGS)
+    LOG_STARTUP_TIMINGS = os.getenv("LOG_STARTUP_TIMINGS", "0") == "1"
+
+    # SQLite uses a static/file pool that takes none of these options
+    SQLALCHEMY_ENGINE_OPTIONS = {} if SQLALCHEMY_DATABASE_URI.startswith("sqlite") else {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    }
+
+    REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+    REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+    REDIS_DB = int(os.getenv("REDIS_DB", 0))
+
+    # Shared, bounded Redis pool: callers wait up to REDIS_POOL_TIMEOUT
+    # for a free connection instead of opening unbounded sockets
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+    REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 2))
+    REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 2))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
+
+    # Proxies in front of the app (load balancer, nginx) whose
+    # X-Forwarded-For/-Proto/-Host are trusted, so request.remote_addr is
+    # the client's and per-IP rate limits aren't shared by every caller.
+    # Only set it when a proxy always sets those headers: 0 trusts none
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 0))
+
+    # Set to a Redis URL (e.g. redis://localhost:6379/0) to run several
+    # workers: Socket.IO emits are then relayed to every process.
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
 
     OTP_EXPIRY = 180
+    OTP_MAX_ATTEMPTS = 3
+
+    # "orjson" (if installed) or "stdlib" for HTTP and socket JSON;
+    # SOCKETIO_SERIALIZER=msgpack switches socket packets to binary
+    JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson")
+    SOCKETIO_SERIALIZER = os.getenv("SOCKETIO_SERIALIZER", "default")
+
+    # GET /metrics: optional bearer token, and X-Query-Count headers
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    METRICS_DEBUG_HEADERS = os.getenv("METRICS_DEBUG_HEADERS", "0") == "1"
+
+    # Verified-token cache shared by HTTP and socket auth
+    AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+    AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", 60))
+
+    # Group commit for POST /chat/<chat_id>/message (message_service.py)
+    CHAT_GROUP_COMMIT = os.getenv("CHAT_GROUP_COMMIT", "0") == "1"
+    CHAT_GROUP_COMMIT_MAX_BATCH = int(os.getenv("CHAT_GROUP_COMMIT_MAX_BATCH", 64))
+    CHAT_GROUP_COMMIT_MAX_WAIT_MS = float(os.getenv("CHAT_GROUP_COMMIT_MAX_WAIT_MS", 5))
+
+    # Idempotency keys for message sends (delivery_service.py): how long a
+    # sent message is remembered, and how long an in-flight send holds its key
+    MESSAGE_IDEMPOTENCY_TTL = int(os.getenv("MESSAGE_IDEMPOTENCY_TTL", 86400))
+    MESSAGE_IDEMPOTENCY_PENDING_TTL = 30
 
-    EMAIL_HOST = "smtp.gmail.com"
-    EMAIL_PORT = 587
+    # Strategy change events to the same strategy within this window are
+    # merged into one broadcast (strategy_events.py); 0 sends immediately
+    STRATEGY_BROADCAST_WINDOW_MS = float(os.getenv("STRATEGY_BROADCAST_WINDOW_MS", 100))
+
+    # POST /batch: sub-requests per call, and worker threads for
+    # "parallel": true batches of GETs
+    BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", 20))
+    BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", 4))
+
+    # Sliding-window rate limits (utils/rate_limit.py), "<hits>/<seconds>"
+    # per "<route>:<scope>". Override with RATE_LIMITS="login:ip=60/300,..."
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMITS = {
+        "send_otp:ip": "20/3600",
+        "send_otp:email": "5/3600",
+        "resend_otp:ip": "20/3600",
+        "resend_otp:email": "5/3600",
+        "verify_otp:ip": "30/600",
+        "verify_otp:email": "10/600",
+        "login:ip": "30/300",
+        "login:email": "10/300",
+        "send_message:user": "60/10",
+        **dict(
+            rule.strip().split("=", 1)
+            for rule in os.getenv("RATE_LIMITS", "").split(",")
+            if "=" in rule
+        )
+    }
+
+    # GET /strategy/public paging; every (page, per_page) is cached separately
+    PUBLIC_STRATEGIES_PAGE_SIZE = 10
+    PUBLIC_STRATEGIES_MAX_PAGE_SIZE = 100
+    PUBLIC_STRATEGIES_MAX_PAGE = 1000
+
+    # GET /strategy/private?page=..., same per_page bounds
+    PRIVATE_STRATEGIES_PAGE_SIZE = 10
+    PRIVATE_STRATEGIES_MAX_PAGE_SIZE = 100
+
+    # GET /chat/<chat_id>/messages window size
+    MESSAGES_PAGE_SIZE = 50
+    MESSAGES_MAX_PAGE_SIZE = 200
+
+    # GET /chat/search; ranked results page by offset, capped so deep
+    # pages cannot turn into scans of every posting
+    SEARCH_PAGE_SIZE = 20
+    SEARCH_MAX_PAGE_SIZE = 100
+    SEARCH_MAX_OFFSET = 1000
+    # newest postings per query term considered for ranking; older matches
+    # of very common terms fall out rather than every posting being counted
+    SEARCH_MAX_POSTINGS = int(os.getenv("SEARCH_MAX_POSTINGS", 5000))
+
+    # `flask archive-messages` moves read messages older than this into
+    # compressed message_archive blocks (archive_service.py)
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 90))
+    ARCHIVE_BLOCK_SIZE = int(os.getenv("ARCHIVE_BLOCK_SIZE", 500))
+
+    # GET /chat/sync: messages per response, and how far each new cursor
+    # is set back so rows committed late with an earlier timestamp are
+    # not skipped (clients dedupe by id)
+    SYNC_MAX_MESSAGES = 500
+    SYNC_OVERLAP_SECONDS = float(os.getenv("SYNC_OVERLAP_SECONDS", 2))
+
+    EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
+    EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
     EMAIL_USER = os.getenv("EMAIL_USER")
     EMAIL_PASS = os.getenv("EMAIL_PASS")
+    EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "1") == "1"
+
+    # Background OTP delivery (app/services/email_service.py)
+    EMAIL_POOL_SIZE = int(os.getenv("EMAIL_POOL_SIZE", 2))
+    EMAIL_IDLE_TIMEOUT = int(os.getenv("EMAIL_IDLE_TIMEOUT", 60))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 20))
+    EMAIL_MAX_RETRIES = int(os.getenv("EMAIL_MAX_RETRIES", 3))
+    EMAIL_RETRY_BACKOFF = float(os.getenv("EMAIL_RETRY_BACKOFF", 1.0))
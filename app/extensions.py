@@ -1,17 +1,58 @@
 
 # app/extensions.py
+import threading
 from flask_sqlalchemy import SQLAlchemy
 from flask_socketio import SocketIO
 import redis
 from .config import Config  # ✅ correct import
+from .metrics import InstrumentedRedisConnection, count_socketio_emit
+
+
+class InstrumentedSocketIO(SocketIO):
+    def emit(self, *args, **kwargs):
+        count_socketio_emit()
+        return super().emit(*args, **kwargs)
+
+
+class LazyRedis:
+    """Builds the pooled Redis client on first attribute access, so
+    importing this module doesn't construct it."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self._get_client(), name)
+
+
+def _build_redis_client():
+    # one bounded pool shared by every thread/greenlet
+    pool = redis.BlockingConnectionPool(
+        host=Config.REDIS_HOST,
+        port=Config.REDIS_PORT,
+        db=Config.REDIS_DB,
+        decode_responses=True,
+        max_connections=Config.REDIS_MAX_CONNECTIONS,
+        timeout=Config.REDIS_POOL_TIMEOUT,
+        socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=Config.REDIS_CONNECT_TIMEOUT,
+        health_check_interval=Config.REDIS_HEALTH_CHECK_INTERVAL,
+        connection_class=InstrumentedRedisConnection
+    )
+    return redis.StrictRedis(connection_pool=pool)
+
 
 db = SQLAlchemy()
-socketio = SocketIO()
+socketio = InstrumentedSocketIO()
 
 # Redis client
-redis_client = redis.StrictRedis(
-    host=Config.REDIS_HOST,
-    port=Config.REDIS_PORT,
-    db=Config.REDIS_DB,
-    decode_responses=True
-)
+redis_client = LazyRedis(_build_redis_client)
@@ -0,0 +1,222 @@
+# app/metrics.py
+#
+# Lightweight instrumentation, exported in Prometheus text format at
+# GET /metrics. Per HTTP endpoint we record latency, SQL statement count and
+# time, Redis commands and Socket.IO emits; work done outside an HTTP
+# request (socket handlers, background threads) is labelled "background".
+# Counters are per process: scrape every worker.
+
+import threading
+import time
+from flask import Response, current_app, g, has_app_context, has_request_context, request
+import redis
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500)
+BACKGROUND = "background"
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}     # (name, labels) -> value
+        self._histograms = {}   # (name, labels) -> [bucket counts..., sum, count]
+        self._help = {}
+        self._buckets = {}
+
+    def describe(self, name, kind, help_text, buckets=None):
+        self._help[name] = (kind, help_text)
+        if buckets:
+            self._buckets[name] = buckets
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = self._buckets[name]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    def render(self, extra=()):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        def fmt(labels):
+            if not labels:
+                return ""
+            body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            return "{" + body + "}"
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                kind, help_text = self._help.get(name, ("counter", ""))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{fmt(labels)} {value}")
+
+        for (name, labels), hist in histograms:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {self._help[name][1]}")
+                lines.append(f"# TYPE {name} histogram")
+            for bound, count in zip(self._buckets[name], hist):
+                lines.append(f"{name}_bucket{fmt(labels + (('le', str(bound)),))} {count}")
+            lines.append(f"{name}_bucket{fmt(labels + (('le', '+Inf'),))} {hist[-1]}")
+            lines.append(f"{name}_sum{fmt(labels)} {hist[-2]}")
+            lines.append(f"{name}_count{fmt(labels)} {hist[-1]}")
+
+        for name, kind, help_text, value in extra:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+registry.describe("http_requests_total", "counter", "HTTP requests by endpoint, method and status.")
+registry.describe("http_request_duration_seconds", "histogram",
+                  "HTTP request latency by endpoint.", LATENCY_BUCKETS)
+registry.describe("db_statements_total", "counter", "SQL statements executed.")
+registry.describe("db_statement_seconds_total", "counter", "Time spent in SQL statements.")
+registry.describe("db_statements_per_request", "histogram",
+                  "SQL statements per HTTP request (N+1 detector).", STATEMENT_BUCKETS)
+registry.describe("redis_commands_total", "counter", "Redis commands sent.")
+registry.describe("socketio_emits_total", "counter", "Socket.IO emits.")
+
+
+# -------------------------------------------------
+# PER-REQUEST ACCOUNTING
+# -------------------------------------------------
+_TALLY_METRICS = {
+    "db_statements": "db_statements_total",
+    "db_seconds": "db_statement_seconds_total",
+    "redis_commands": "redis_commands_total",
+    "socketio_emits": "socketio_emits_total"
+}
+
+
+def _record(field, amount=1):
+    """Add to the current HTTP request's tally, or straight to the registry."""
+    if has_app_context() and has_request_context() and "metrics" in g:
+        g.metrics[field] += amount
+        return
+    registry.inc(_TALLY_METRICS[field], {"endpoint": BACKGROUND}, amount)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_started"].pop()
+    _record("db_statements")
+    _record("db_seconds", time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    started = context.connection.info.get("metrics_started") if context.connection else None
+    if started:
+        started.pop()
+
+
+class InstrumentedRedisConnection(redis.Connection):
+    """Counts commands, including each command inside a pipeline."""
+
+    def pack_command(self, *args):
+        _record("redis_commands")
+        return super().pack_command(*args)
+
+    def pack_commands(self, commands):
+        commands = list(commands)
+        _record("redis_commands", len(commands))
+        return super().pack_commands(commands)
+
+
+def count_socketio_emit():
+    _record("socketio_emits")
+
+
+# -------------------------------------------------
+# FLASK WIRING
+# -------------------------------------------------
+def init_metrics(app):
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics = {
+            "started": time.perf_counter(),
+            "db_statements": 0,
+            "db_seconds": 0.0,
+            "redis_commands": 0,
+            "socketio_emits": 0
+        }
+
+    @app.after_request
+    def _finish_request_metrics(response):
+        tally = g.pop("metrics", None)
+        if tally is None:
+            return response
+
+        endpoint = request.endpoint or "unknown"
+        elapsed = time.perf_counter() - tally["started"]
+        labels = {"endpoint": endpoint}
+
+        registry.inc("http_requests_total",
+                     {**labels, "method": request.method, "status": str(response.status_code)})
+        registry.observe("http_request_duration_seconds", labels, elapsed)
+        registry.observe("db_statements_per_request", labels, tally["db_statements"])
+        registry.inc("db_statements_total", labels, tally["db_statements"])
+        registry.inc("db_statement_seconds_total", labels, tally["db_seconds"])
+        registry.inc("redis_commands_total", labels, tally["redis_commands"])
+        registry.inc("socketio_emits_total", labels, tally["socketio_emits"])
+
+        if app.debug or app.config.get("METRICS_DEBUG_HEADERS"):
+            response.headers["X-Query-Count"] = str(tally["db_statements"])
+            response.headers["X-Query-Time-Ms"] = f"{tally['db_seconds'] * 1000:.2f}"
+            response.headers["X-Redis-Commands"] = str(tally["redis_commands"])
+
+        return response
+
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint, methods=["GET"])
+
+
+def metrics_endpoint():
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+
+    from app.utils.auth import auth_cache
+    stats = auth_cache.stats()
+    extra = (
+        ("auth_cache_hits_total", "counter", "Verified-token cache hits.", stats["hits"]),
+        ("auth_cache_misses_total", "counter", "Verified-token cache misses.", stats["misses"]),
+        ("auth_cache_size", "gauge", "Verified-token cache entries.", stats["size"]),
+    )
+
+    return Response(
+        registry.render(extra),
+        mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,229 @@
+# app/migrations.py
+#
+# Versioned schema migrations for databases that already exist.
+# db.create_all() only creates missing tables, so columns and indexes added
+# to app/models.py after a table was created land here as numbered steps.
+# Applied versions are recorded in schema_migrations. A database that
+# create_schema() builds from nothing is already at the model schema, so
+# every step is recorded as applied there; steps are idempotent besides.
+#
+#   flask db-upgrade     apply pending steps
+#   flask db-status      list steps and whether they are applied
+
+from datetime import datetime
+from sqlalchemy import Column, DateTime, inspect, text
+from app.extensions import db
+from app.models import Chat, Message, MessageArchive, MessageTerm, Strategy
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def _add_column(conn, table, column, default=None):
+    """ALTER TABLE ... ADD COLUMN from a Column, unless present; returns
+    whether it was added.
+
+    Added as NULL, or NOT NULL DEFAULT <default> when a default is given
+    (existing rows take the default).
+    """
+    existing = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    if column.name in existing:
+        return False
+    column_type = column.type.compile(dialect=conn.dialect)
+    nullability = "NULL" if default is None else f"NOT NULL DEFAULT {default}"
+    conn.execute(text(
+        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type} {nullability}"
+    ))
+    return True
+
+
+def _create_index(conn, table, name):
+    """Create a model index, unless present. Indexes no longer in the
+    model are created with _create_raw_index by the steps that added them."""
+    index = next((i for i in table.indexes if i.name == name), None)
+    if index is None:
+        raise LookupError(f"No index {name} on model table {table.name}")
+    index.create(conn, checkfirst=True)
+
+
+def _create_raw_index(conn, table_name, name, columns):
+    existing = {i["name"] for i in inspect(conn).get_indexes(table_name)}
+    if name not in existing:
+        conn.execute(text(f"CREATE INDEX {name} ON {table_name} ({', '.join(columns)})"))
+
+
+def _drop_index(conn, table_name, name):
+    existing = {i["name"] for i in inspect(conn).get_indexes(table_name)}
+    if name not in existing:
+        return
+    if conn.dialect.name in ("mysql", "mariadb"):
+        conn.execute(text(f"DROP INDEX {name} ON {table_name}"))
+    else:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+
+def _drop_column(conn, table_name, column_name):
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    if column_name in existing:
+        conn.execute(text(f"ALTER TABLE {table_name} DROP COLUMN {column_name}"))
+
+
+# -------------------------------------------------
+# MIGRATIONS
+# -------------------------------------------------
+@migration(1, "chats.last_message_* inbox pointer")
+def _chat_last_message(conn):
+    table = Chat.__table__
+    for name in ("last_message_id", "last_message_sender_id", "last_message_preview"):
+        _add_column(conn, table, table.c[name])
+
+
+@migration(2, "composite indexes for chat and strategy hot queries")
+def _hot_query_indexes(conn):
+    _create_index(conn, Message.__table__, "ix_message_chat_created_id")
+    # removed from the model by step 6, which drops it again
+    _create_raw_index(conn, "message", "ix_message_receiver_read_chat",
+                      ("receiver_id", "is_read", "chat_id"))
+    _create_index(conn, Chat.__table__, "ix_chats_creator_updated")
+    _create_index(conn, Chat.__table__, "ix_chats_user_updated")
+    _create_index(conn, Strategy.__table__, "ix_strategy_status_published")
+    _create_index(conn, Strategy.__table__, "ix_strategy_owner_id_id")
+
+
+@migration(3, "message_terms full-text search index")
+def _message_terms(conn):
+    # populate with `flask rebuild-search-index`
+    MessageTerm.__table__.create(conn, checkfirst=True)
+
+
+@migration(4, "message_archive cold storage")
+def _message_archive(conn):
+    MessageArchive.__table__.create(conn, checkfirst=True)
+
+
+@migration(5, "message.read_at for delta sync")
+def _message_read_at(conn):
+    # removed from the model by step 6, which drops both again
+    _add_column(conn, Message.__table__, Column("read_at", DateTime))
+    _create_raw_index(conn, "message", "ix_message_chat_read_at", ("chat_id", "read_at"))
+
+
+@migration(6, "per-participant read watermarks on chats")
+def _read_watermarks(conn):
+    chats = Chat.__table__
+    added = [
+        side for side in ("creator", "user")
+        if _add_column(conn, chats, chats.c[f"{side}_last_read_id"], default=0)
+    ]
+    _add_column(conn, chats, chats.c.read_updated_at)
+
+    # Backfill from message.is_read: each participant's watermark stops
+    # just below their oldest unread message, or covers the whole chat.
+    # Only for columns added just now; is_read is no longer written, so
+    # replaying this over live watermarks would mark read chats unread
+    for side in added:
+        conn.execute(text(
+            f"UPDATE chats SET {side}_last_read_id = COALESCE("
+            "  (SELECT MIN(m.id) - 1 FROM message m WHERE m.chat_id = chats.id"
+            f"   AND m.receiver_id = chats.{side}_id AND m.is_read = :false),"
+            "  (SELECT MAX(m.id) FROM message m WHERE m.chat_id = chats.id),"
+            "  chats.last_message_id, 0)"
+        ), {"false": False})
+
+    _create_index(conn, Message.__table__, "ix_message_chat_receiver_id")
+    _create_index(conn, chats, "ix_chats_creator_read_updated")
+    _create_index(conn, chats, "ix_chats_user_read_updated")
+
+    # read marking no longer writes message rows; drop what indexed them
+    _drop_index(conn, "message", "ix_message_receiver_read_chat")
+    _drop_index(conn, "message", "ix_message_chat_read_at")
+    _drop_column(conn, "message", "read_at")
+
+
+@migration(7, "binary collation for message_terms.term")
+def _message_terms_binary(conn):
+    if conn.dialect.name not in ("mysql", "mariadb"):
+        return
+    conn.execute(text(
+        "ALTER TABLE message_terms MODIFY term VARCHAR(64) "
+        "CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL"
+    ))
+
+
+# -------------------------------------------------
+# RUNNER
+# -------------------------------------------------
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER NOT NULL PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at DATETIME NOT NULL)"
+    ))
+
+
+def applied_versions():
+    with db.engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def _record(conn, version, description):
+    conn.execute(
+        text(
+            "INSERT INTO schema_migrations (version, description, applied_at) "
+            "VALUES (:version, :description, :applied_at)"
+        ),
+        {"version": version, "description": description, "applied_at": datetime.utcnow()}
+    )
+
+
+def create_schema():
+    """db.create_all(); returns whether the database was empty.
+
+    An empty database comes out at the model schema, so every migration
+    is recorded as applied. An existing one only gets its missing tables;
+    its pending steps are left to upgrade().
+    """
+    existing = set(inspect(db.engine).get_table_names())
+    fresh = not existing & set(db.metadata.tables)
+    db.create_all()
+
+    if fresh:
+        with db.engine.begin() as conn:
+            _ensure_version_table(conn)
+            done = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+            for version, description, _ in MIGRATIONS:
+                if version not in done:
+                    _record(conn, version, description)
+
+    return fresh
+
+
+def upgrade(log=print):
+    """Apply pending migrations in order; returns the versions applied."""
+    done = applied_versions()
+    applied = []
+
+    for version, description, fn in MIGRATIONS:
+        if version in done:
+            continue
+
+        # MySQL commits DDL implicitly, so each step records itself only
+        # after it finished; a failed step is retried on the next run
+        with db.engine.begin() as conn:
+            fn(conn)
+        with db.engine.begin() as conn:
+            _record(conn, version, description)
+
+        log(f"✅ Applied migration {version}: {description}")
+        applied.append(version)
+
+    return applied
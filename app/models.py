@@ -1,5 +1,6 @@
 
 from datetime import datetime
+from sqlalchemy.dialects import mysql
 from app.extensions import db
 # -----------------------------
 # USER MODEL (minimal required)
@@ -31,6 +32,11 @@ class Strategy(db.Model):
 
     owner_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     owner = db.relationship("User", backref="strategies")
+
+    __table_args__ = (
+        db.Index("ix_strategy_status_published", "status", "published"),
+        db.Index("ix_strategy_owner_id_id", "owner_id", "id"),
+    )
 class Chat(db.Model):
     __tablename__ = "chats"
 
@@ -61,6 +67,17 @@ class Chat(db.Model):
         onupdate=datetime.utcnow
     )
 
+    # Denormalized pointer to the newest message, kept by send_message
+    last_message_id = db.Column(db.Integer, nullable=True)
+    last_message_sender_id = db.Column(db.Integer, nullable=True)
+    last_message_preview = db.Column(db.String(255), nullable=True)
+
+    # Read watermarks: each participant has read every message addressed
+    # to them with id <= their watermark. read_updated_at feeds /chat/sync.
+    creator_last_read_id = db.Column(db.Integer, nullable=False, default=0)
+    user_last_read_id = db.Column(db.Integer, nullable=False, default=0)
+    read_updated_at = db.Column(db.DateTime, nullable=True)
+
     __table_args__ = (
         db.UniqueConstraint(
             "strategy_id",
@@ -68,6 +85,12 @@ class Chat(db.Model):
             "user_id",
             name="unique_chat"
         ),
+        # Inbox listing for either side of the chat
+        db.Index("ix_chats_creator_updated", "creator_id", "updated_at"),
+        db.Index("ix_chats_user_updated", "user_id", "updated_at"),
+        # Read-state changes for GET /chat/sync
+        db.Index("ix_chats_creator_read_updated", "creator_id", "read_updated_at"),
+        db.Index("ix_chats_user_read_updated", "user_id", "read_updated_at"),
     )
 
     # 🔥 Relationships
@@ -105,9 +128,81 @@ class Message(db.Model):
     )
 
     content = db.Column(db.Text, nullable=False)
+    # Legacy per-row flag, superseded by the Chat.*_last_read_id
+    # watermarks and no longer written; kept as the migration source
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Keyset pagination for GET /chat/<chat_id>/messages; its
+        # (chat_id, created_at) prefix also serves plain per-chat scans
+        db.Index("ix_message_chat_created_id", "chat_id", "created_at", "id"),
+        # Unread counts and read marking: messages to a participant above
+        # their watermark are one range seek
+        db.Index("ix_message_chat_receiver_id", "chat_id", "receiver_id", "id"),
+    )
+
     # 🔑 Relationships
     sender = db.relationship("User", foreign_keys=[sender_id])
-    receiver = db.relationship("User", foreign_keys=[receiver_id])  
\ No newline at end of file
+    receiver = db.relationship("User", foreign_keys=[receiver_id])
+class MessageTerm(db.Model):
+    """Inverted index for GET /chat/search: one row per (term, message).
+
+    chat_id is copied from the message so a search is a range seek on
+    (term, chat_id) for each of the caller's chats.
+
+    term compares byte-for-byte on MySQL: under the default accent- and
+    case-insensitive collation "resume" and "résumé" from one message
+    would collide on the primary key and fail the send.
+    """
+    __tablename__ = "message_terms"
+
+    term = db.Column(
+        db.String(64).with_variant(
+            mysql.VARCHAR(64, charset="utf8mb4", collation="utf8mb4_bin"), "mysql", "mariadb"
+        ),
+        primary_key=True
+    )
+    chat_id = db.Column(db.Integer, primary_key=True)
+    message_id = db.Column(
+        db.Integer,
+        db.ForeignKey("message.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    __table_args__ = (
+        # rebuilds and deletes by message
+        db.Index("ix_message_terms_message", "message_id"),
+    )
+class MessageArchive(db.Model):
+    """Cold storage for old messages: one zlib-compressed block per row.
+
+    A block holds a contiguous (created_at, id) run of one chat's messages;
+    first_/last_ keys let GET /chat/<id>/messages seek blocks by cursor.
+    """
+    __tablename__ = "message_archive"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    chat_id = db.Column(
+        db.Integer,
+        db.ForeignKey("chats.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    first_created_at = db.Column(db.DateTime, nullable=False)
+    first_message_id = db.Column(db.Integer, nullable=False)
+    last_created_at = db.Column(db.DateTime, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=False)
+    min_message_id = db.Column(db.Integer, nullable=False)
+    max_message_id = db.Column(db.Integer, nullable=False)
+
+    message_count = db.Column(db.Integer, nullable=False)
+    # MEDIUMBLOB on MySQL; a plain BLOB caps out at 64 KB
+    payload = db.Column(db.LargeBinary(length=16777215), nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_message_archive_chat_last", "chat_id", "last_created_at", "last_message_id"),
+        db.Index("ix_message_archive_chat_first", "chat_id", "first_created_at", "first_message_id"),
+    )
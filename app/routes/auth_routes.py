@@ -2,13 +2,13 @@ from flask import Blueprint, request, jsonify, current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.extensions import db, redis_client
 from app.models import User
-from app.services.email_service import send_otp_email
+from app.services.email_service import queue_otp_email
 from app.services.otp_service import (
     generate_and_store_otp,
     verify_otp,
-    can_resend_otp,
-    increment_attempt
+    resend_otp_if_allowed
 )
+from app.utils.rate_limit import rate_limit
 import jwt
 import datetime
 
@@ -18,6 +18,7 @@ auth_bp = Blueprint("auth_bp", __name__, url_prefix="/auth")
 # SEND OTP
 # -------------------------------------------------
 @auth_bp.route("/send_otp", methods=["POST"])
+@rate_limit("send_otp", "ip", "email")
 def send_otp():
     data = request.get_json()
     email = data.get("email")
@@ -34,7 +35,7 @@ def send_otp():
         return jsonify({"message": "Email already registered"}), 400
 
     otp = generate_and_store_otp(email)
-    send_otp_email(email, otp)
+    queue_otp_email(email, otp)
 
     return jsonify({"message": "OTP sent successfully"}), 200
 
@@ -43,6 +44,7 @@ def send_otp():
 # VERIFY OTP
 # -------------------------------------------------
 @auth_bp.route("/verify_otp", methods=["POST"])
+@rate_limit("verify_otp", "ip", "email")
 def verify_otp_route():
     data = request.get_json()
     email = data.get("email")
@@ -55,12 +57,12 @@ def verify_otp_route():
     email = email.strip()
     otp = str(otp).strip()
 
-    if verify_otp(email, otp):
+    # a mismatch counts towards the lockout in the same round trip
+    if verify_otp(email, otp, count_attempt=True):
         # Mark OTP as verified for 5 minutes
         redis_client.set(f"{email}_verified", "1", ex=300)
         return jsonify({"message": "OTP verified successfully"}), 200
 
-    increment_attempt(email)
     return jsonify({"message": "Invalid OTP"}), 400
 
 
@@ -68,6 +70,7 @@ def verify_otp_route():
 # RESEND OTP
 # -------------------------------------------------
 @auth_bp.route("/resend_otp", methods=["POST"])
+@rate_limit("resend_otp", "ip", "email")
 def resend_otp():
     data = request.get_json()
     email = data.get("email")
@@ -75,11 +78,12 @@ def resend_otp():
     if not email:
         return jsonify({"message": "Email is required"}), 400
 
-    if not can_resend_otp(email):
+    # lock check and regeneration happen atomically
+    otp = resend_otp_if_allowed(email)
+    if otp is None:
         return jsonify({"message": "Please wait before requesting OTP again"}), 429
 
-    otp = generate_and_store_otp(email)
-    send_otp_email(email, otp)
+    queue_otp_email(email, otp)
 
     return jsonify({"message": "OTP resent successfully"}), 200
 
@@ -112,6 +116,7 @@ def create_account():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@rate_limit("login", "ip", "email")
 def login():
     data = request.get_json()
 
@@ -0,0 +1,188 @@
+# app/routes/batch_routes.py
+#
+# POST /batch: several API calls in one round trip, e.g. the dashboard
+# bootstrap:
+#
+#   {"parallel": true, "requests": [
+#       {"id": "profile", "method": "GET", "path": "/chat/profile"},
+#       {"id": "chats", "method": "GET", "path": "/chat/list"},
+#       {"id": "public", "method": "GET", "path": "/strategy/public?page=1"}
+#   ]}
+#
+# The caller's token is verified once; each sub-request goes through the
+# normal URL map, hooks and view, with token_required reusing the batch
+# user. Sub-requests share this request's app context and DB session and
+# run in order. With "parallel": true and only GETs they run on a small
+# thread pool instead, each with its own app context and session.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+from flask import Blueprint, Response, current_app, g, jsonify, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from app.extensions import db
+from app.utils.auth import token_required
+
+batch_bp = Blueprint("batch_bp", __name__)
+
+ALLOWED_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+# per-sub-request headers worth honouring; auth always comes from the batch
+FORWARDED_HEADERS = ("If-None-Match", "Idempotency-Key")
+# client address headers copied from the batch request itself, so logging
+# sees the real caller; per-IP rate limits use REMOTE_ADDR, which ProxyFix
+# has already resolved on the outer request (see _origin)
+ORIGIN_HEADERS = ("X-Forwarded-For", "X-Forwarded-Proto", "X-Forwarded-Host", "X-Real-IP", "User-Agent")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config["BATCH_MAX_WORKERS"],
+                thread_name_prefix="batch"
+            )
+        return _executor
+
+
+def _is_batch_endpoint(path, method):
+    """Whether path resolves to this view, however it is spelled
+    ("/batch/", "/%62atch", ...)."""
+    try:
+        endpoint, _ = current_app.url_map.bind("").match(
+            unquote(path.split("?", 1)[0]), method
+        )
+    except HTTPException:
+        return False
+    return endpoint == f"{batch_bp.name}.batch"
+
+
+def _validate(data):
+    """Return (requests, error_message)."""
+    items = data.get("requests") if isinstance(data, dict) else None
+    limit = current_app.config["BATCH_MAX_REQUESTS"]
+
+    if not isinstance(items, list) or not items:
+        return None, "requests must be a non-empty list"
+    if len(items) > limit:
+        return None, f"At most {limit} requests per batch"
+
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            return None, f"requests[{index}] must be an object"
+        path = item.get("path")
+        if not isinstance(path, str) or not path.startswith("/"):
+            return None, f"requests[{index}].path must start with /"
+        method = str(item.get("method", "GET")).upper()
+        if method not in ALLOWED_METHODS:
+            return None, f"requests[{index}].method is not supported"
+        if _is_batch_endpoint(path, method):
+            return None, "Batches cannot be nested"
+        headers = item.get("headers", {})
+        if not isinstance(headers, dict):
+            return None, f"requests[{index}].headers must be an object"
+        for name in FORWARDED_HEADERS:
+            value = headers.get(name)
+            if value is not None and (not isinstance(value, str) or "\r" in value or "\n" in value):
+                return None, f"requests[{index}].headers.{name} must be a single-line string"
+
+    return items, None
+
+
+def _origin(req):
+    """(environ_base, headers) describing the batch caller, captured
+    up front so worker threads need no access to the outer request."""
+    return (
+        {"REMOTE_ADDR": req.remote_addr},
+        {name: req.headers[name] for name in ORIGIN_HEADERS if name in req.headers}
+    )
+
+
+def _dispatch(app, item, origin):
+    """Run one sub-request through the app; returns (status, json_bytes)."""
+    environ_base, origin_headers = origin
+    sub_headers = item.get("headers", {})
+    headers = {
+        **origin_headers,
+        **{name: sub_headers[name] for name in FORWARDED_HEADERS if name in sub_headers}
+    }
+
+    # the sub-request's metrics hooks must not clobber the batch's tally
+    outer_metrics = g.pop("metrics", None)
+    builder = None
+    try:
+        builder = EnvironBuilder(
+            path=item["path"],
+            method=str(item.get("method", "GET")).upper(),
+            headers=headers,
+            environ_base=environ_base,
+            **({"json": item["body"]} if "body" in item else {})
+        )
+        with app.request_context(builder.get_environ()):
+            response = app.full_dispatch_request()
+            body = response.get_data()
+            if not body:
+                body = b"null"
+            elif not response.is_json:
+                body = app.json.dumps(response.get_data(as_text=True)).encode()
+            return response.status_code, body
+    except Exception as e:
+        db.session.rollback()
+        print("❌ Batch sub-request failed:", item["path"], e)
+        return 500, app.json.dumps({"status": "error", "message": "Internal error"}).encode()
+    finally:
+        if builder is not None:
+            builder.close()
+        if outer_metrics is not None:
+            g.metrics = outer_metrics
+
+
+def _dispatch_in_own_context(app, item, user, origin):
+    with app.app_context():
+        g.batch_user = user
+        return _dispatch(app, item, origin)
+
+
+@batch_bp.route("/batch", methods=["POST"])
+@token_required
+def batch(current_user):
+    data = request.get_json(silent=True)
+    items, error = _validate(data)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+
+    app = current_app._get_current_object()
+    g.batch_user = current_user
+    origin = _origin(request)
+
+    parallel = bool(data.get("parallel")) and len(items) > 1 and all(
+        str(item.get("method", "GET")).upper() == "GET" for item in items
+    )
+
+    if parallel:
+        futures = [
+            _get_executor().submit(_dispatch_in_own_context, app, item, current_user, origin)
+            for item in items
+        ]
+        results = [future.result() for future in futures]
+    else:
+        results = [_dispatch(app, item, origin) for item in items]
+
+    # sub-responses are already JSON: splice them in rather than re-parse
+    dumps = app.json.dumps
+    parts = [
+        b'{"id":' + dumps(item.get("id", index)).encode()
+        + b',"status":' + str(status).encode()
+        + b',"body":' + body + b"}"
+        for index, (item, (status, body)) in enumerate(zip(items, results))
+    ]
+
+    return Response(
+        b'{"status":"success","data":[' + b",".join(parts) + b"]}",
+        status=200,
+        mimetype="application/json"
+    )
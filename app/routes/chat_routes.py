@@ -1,12 +1,20 @@
 
-from flask import Blueprint, request, jsonify
-from datetime import datetime
-from sqlalchemy import func, case
+from flask import Blueprint, request, jsonify, current_app
+from datetime import datetime, timedelta
+from sqlalchemy.orm import aliased
 from app.extensions import db, socketio
-from app.models import Chat, Message
+from app.models import Chat, Message, Strategy, User
+from app.services.archive_service import archived_after, archived_before, find_archived
+from app.services.delivery_service import MessageInFlight, deliver_message, validate_client_msg_id
+from app.services.read_service import group_read_receipts, is_read, mark_chats_read, read_watermarks
+from app.services.search_service import search_messages
+from app.services.sync_service import decode_cursor, encode_cursor, new_messages, read_changes
+from app.services.unread_service import get_unread_counts
 from app.utils.auth import token_required
+from app.utils.rate_limit import rate_limit
 
 chat_bp = Blueprint("chat_bp", __name__, url_prefix="/chat")
+
 @chat_bp.route("/start", methods=["POST"])
 @token_required
 def start_chat(current_user):
@@ -78,6 +86,7 @@ def start_chat(current_user):
 # -------------------------------------------------
 @chat_bp.route("/<int:chat_id>/message", methods=["POST"])
 @token_required
+@rate_limit("send_message", "user")
 def send_message(current_user, chat_id):
     chat = Chat.query.get_or_404(chat_id)
 
@@ -90,116 +99,199 @@ def send_message(current_user, chat_id):
     if not content:
         return jsonify({"status": "error", "message": "Content is required"}), 400
 
-    receiver_id = chat.creator_id if current_user.id == chat.user_id else chat.user_id
-
-    message = Message(
-        chat_id=chat.id,
-        sender_id=current_user.id,
-        receiver_id=receiver_id,
-        content=content,
-        created_at=datetime.utcnow(),
-        is_read=False
-    )
-
-    db.session.add(message)
-
-    # 🔥 bump chat to top
-    chat.updated_at = datetime.utcnow()
-
-    db.session.commit()
-
-    message_data = {
-        "message_id": message.id,
-        "chat_id": chat.id,
-        "sender_id": message.sender_id,
-        "sender_name": message.sender.name,
-        "receiver_id": message.receiver_id,
-        "receiver_name": message.receiver.name,
-        "content": message.content,
-        "created_at": message.created_at.isoformat(),
-        "is_read": message.is_read
-    }
+    # retries carrying the same key return the original message
+    client_msg_id = data.get("client_msg_id") or request.headers.get("Idempotency-Key")
+    error = validate_client_msg_id(client_msg_id)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
 
-    for uid in {current_user.id, receiver_id}:
-        socketio.emit("new_message", message_data, room=f"user_{uid}")
+    try:
+        message_data, duplicate = deliver_message(
+            chat, current_user.id, current_user.name, content, client_msg_id
+        )
+    except MessageInFlight:
+        return jsonify({
+            "status": "error",
+            "message": "A message with this client_msg_id is still being sent"
+        }), 409
 
     return jsonify({
         "status": "success",
         "data": message_data
-    }), 201
+    }), 200 if duplicate else 201
 
 
 # -------------------------------------------------
 # LIST CHATS (UNREAD FIRST, NEWEST ON TOP)
 # -------------------------------------------------
-@chat_bp.route("/list", methods=["GET"])
-@token_required
-def list_chats(current_user):
+def _inbox_query(user_id):
+    """The user's chats with strategy and participant names, one query."""
+    creator = aliased(User)
+    participant = aliased(User)
 
-    unread_subquery = (
-        db.session.query(
-            Message.chat_id,
-            func.count(Message.id).label("unread_count")
-        )
-        .filter(
-            Message.receiver_id == current_user.id,
-            Message.is_read.is_(False)
-        )
-        .group_by(Message.chat_id)
-        .subquery()
-    )
-
-    chats = (
+    return (
         db.session.query(
             Chat,
-            func.coalesce(unread_subquery.c.unread_count, 0).label("unread_count")
+            Strategy.name.label("strategy_name"),
+            creator.name.label("creator_name"),
+            participant.name.label("user_name")
         )
-        .outerjoin(unread_subquery, Chat.id == unread_subquery.c.chat_id)
+        .outerjoin(Strategy, Strategy.id == Chat.strategy_id)
+        .outerjoin(creator, creator.id == Chat.creator_id)
+        .outerjoin(participant, participant.id == Chat.user_id)
         .filter(
-            (Chat.creator_id == current_user.id) |
-            (Chat.user_id == current_user.id)
-        )
-        .order_by(
-            case(
-                (func.coalesce(unread_subquery.c.unread_count, 0) > 0, 1),
-                else_=0
-            ).desc(),
-            Chat.updated_at.desc()
+            (Chat.creator_id == user_id) |
+            (Chat.user_id == user_id)
         )
-        .all()
     )
 
-    data = []
 
-    for chat, unread_count in chats:
-        last_msg = (
-            Message.query
-            .filter_by(chat_id=chat.id)
-            .order_by(Message.created_at.desc())
-            .first()
-        )
+def _chat_data(row, unread_counts):
+    chat, strategy_name, creator_name, user_name = row
 
-        data.append({
-            "id": chat.id,
-            "strategy_id": chat.strategy_id,
-            "strategy_name": chat.strategy.name if chat.strategy else "No strategy",
-            "creator_id": chat.creator_id,
-            "creator_name": chat.creator.name if chat.creator else "Unknown",
-            "user_id": chat.user_id,
-            "user_name": chat.user.name if chat.user else "Unknown",
-            "last_message": last_msg.content if last_msg else "",
-            "last_message_sender_id": last_msg.sender_id if last_msg else None,
-            "last_message_sender_name": last_msg.sender.name if last_msg else "",
-            "updated_at": chat.updated_at,
-            "unread_count": unread_count
-        })
+    sender_id = chat.last_message_sender_id
+    if sender_id is None:
+        sender_name = ""
+    elif sender_id == chat.creator_id:
+        sender_name = creator_name or "Unknown"
+    else:
+        sender_name = user_name or "Unknown"
+
+    return {
+        "id": chat.id,
+        "strategy_id": chat.strategy_id,
+        "strategy_name": strategy_name or "No strategy",
+        "creator_id": chat.creator_id,
+        "creator_name": creator_name or "Unknown",
+        "user_id": chat.user_id,
+        "user_name": user_name or "Unknown",
+        "last_message_id": chat.last_message_id,
+        "last_message": chat.last_message_preview or "",
+        "last_message_sender_id": sender_id,
+        "last_message_sender_name": sender_name,
+        "updated_at": chat.updated_at,
+        "unread_count": unread_counts.get(chat.id, 0)
+    }
+
+
+@chat_bp.route("/list", methods=["GET"])
+@token_required
+def list_chats(current_user):
+
+    unread_counts = get_unread_counts(current_user.id)
+
+    chats = _inbox_query(current_user.id).order_by(Chat.updated_at.desc()).all()
+
+    # unread chats first; sort is stable so each group stays newest-first
+    chats.sort(key=lambda row: unread_counts.get(row[0].id, 0) == 0)
+
+    data = [_chat_data(row, unread_counts) for row in chats]
 
     return jsonify({"status": "success", "data": data}), 200
 
 
 # -------------------------------------------------
-# GET MESSAGES (ASCENDING)
+# DELTA SYNC (WHAT CHANGED SINCE THE LAST CURSOR)
 # -------------------------------------------------
+@chat_bp.route("/sync", methods=["GET"])
+@token_required
+def sync(current_user):
+    started = datetime.utcnow()
+    # rows committed slightly late may carry an earlier timestamp
+    next_since = started - timedelta(seconds=current_app.config["SYNC_OVERLAP_SECONDS"])
+
+    cursor = request.args.get("since")
+
+    # first sync: nothing to diff against, the client loads /chat/list
+    if not cursor:
+        return jsonify({
+            "status": "success",
+            "data": {"chats": [], "messages": [], "reads": []},
+            "cursor": encode_cursor(next_since),
+            "has_more": False
+        }), 200
+
+    try:
+        since, since_id = decode_cursor(cursor)
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid cursor"}), 400
+
+    # older messages may already be in the archive: ask for a full reload
+    if since < started - timedelta(days=current_app.config["ARCHIVE_AFTER_DAYS"]):
+        return jsonify({"status": "error", "message": "Cursor expired, reload"}), 410
+
+    messages, has_more = new_messages(
+        current_user.id, since, since_id, current_app.config["SYNC_MAX_MESSAGES"]
+    )
+    if has_more:
+        # resume exactly after the last message returned
+        next_cursor = encode_cursor(messages[-1].created_at, messages[-1].id)
+    else:
+        next_cursor = encode_cursor(next_since)
+
+    unread_counts = get_unread_counts(current_user.id)
+    chats = (
+        _inbox_query(current_user.id)
+        .filter(Chat.updated_at > since)
+        .order_by(Chat.updated_at.desc())
+        .all()
+    )
+
+    watermarks = read_watermarks({m.chat_id for m in messages})
+    user_ids = {m.sender_id for m in messages} | {m.receiver_id for m in messages}
+    names = dict(
+        db.session.query(User.id, User.name)
+        .filter(User.id.in_(user_ids))
+        .all()
+    ) if user_ids else {}
+
+    return jsonify({
+        "status": "success",
+        "data": {
+            "chats": [_chat_data(row, unread_counts) for row in chats],
+            "messages": [{
+                "id": m.id,
+                "chat_id": m.chat_id,
+                "sender_id": m.sender_id,
+                "sender_name": names.get(m.sender_id),
+                "receiver_id": m.receiver_id,
+                "receiver_name": names.get(m.receiver_id),
+                "content": m.content,
+                "is_read": is_read(watermarks, m),
+                "created_at": m.created_at.isoformat()
+            } for m in messages],
+            "reads": read_changes(current_user.id, since)
+        },
+        "cursor": next_cursor,
+        "has_more": has_more
+    }), 200
+
+
+# -------------------------------------------------
+# GET MESSAGES (KEYSET WINDOW, ASCENDING)
+# -------------------------------------------------
+def _message_window_query(chat_id, cursor=None, after=False):
+    """The chat's messages past a (created_at, id) cursor, nearest first:
+    older ones by default, newer ones with after=True. A range seek on
+    ix_message_chat_created_id."""
+    query = Message.query.filter(Message.chat_id == chat_id)
+
+    if cursor and after:
+        query = query.filter(
+            (Message.created_at > cursor.created_at) |
+            ((Message.created_at == cursor.created_at) & (Message.id > cursor.id))
+        )
+    elif cursor:
+        query = query.filter(
+            (Message.created_at < cursor.created_at) |
+            ((Message.created_at == cursor.created_at) & (Message.id < cursor.id))
+        )
+
+    if after:
+        return query.order_by(Message.created_at.asc(), Message.id.asc())
+    return query.order_by(Message.created_at.desc(), Message.id.desc())
+
+
 @chat_bp.route("/<int:chat_id>/messages", methods=["GET"])
 @token_required
 def get_messages(current_user, chat_id):
@@ -208,25 +300,146 @@ def get_messages(current_user, chat_id):
     if current_user.id not in [chat.user_id, chat.creator_id]:
         return jsonify({"status": "error", "message": "Access denied"}), 403
 
-    messages = (
-        Message.query
-        .filter_by(chat_id=chat.id)
-        .order_by(Message.created_at.asc())
+    before_id = request.args.get("before_id", type=int)
+    after_id = request.args.get("after_id", type=int)
+
+    if before_id and after_id:
+        return jsonify({
+            "status": "error",
+            "message": "Use either before_id or after_id, not both"
+        }), 400
+
+    limit = request.args.get(
+        "limit", current_app.config["MESSAGES_PAGE_SIZE"], type=int
+    )
+    limit = max(1, min(limit, current_app.config["MESSAGES_MAX_PAGE_SIZE"]))
+
+    cursor = None
+    cursor_archived = False
+    cursor_id = before_id or after_id
+    if cursor_id:
+        cursor = (
+            db.session.query(Message.created_at, Message.id)
+            .filter(Message.id == cursor_id, Message.chat_id == chat.id)
+            .first()
+        )
+        if not cursor:
+            # paging through old history: the cursor lives in the archive
+            cursor = find_archived(chat.id, cursor_id)
+            cursor_archived = cursor is not None
+        if not cursor:
+            return jsonify({"status": "error", "message": "Invalid cursor"}), 400
+
+    query = _message_window_query(chat.id, cursor, after=bool(after_id))
+
+    # Archived messages are all older than hot ones, so the archive is only
+    # read when a page runs past the oldest hot message
+    if after_id:
+        messages = archived_after(chat.id, cursor, limit + 1) if cursor_archived else []
+        if len(messages) <= limit:
+            messages += query.limit(limit + 1 - len(messages)).all()
+    else:
+        # newest window by default, and when paging backwards
+        messages = [] if cursor_archived else query.limit(limit + 1).all()
+        if len(messages) <= limit:
+            messages += archived_before(chat.id, cursor, limit + 1 - len(messages))
+
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if not after_id:
+        messages.reverse()
+
+    watermarks = {chat.id: {
+        chat.creator_id: chat.creator_last_read_id or 0,
+        chat.user_id: chat.user_last_read_id or 0
+    }}
+
+    # Only two participants per chat: resolve their names once per page
+    names = dict(
+        db.session.query(User.id, User.name)
+        .filter(User.id.in_([chat.user_id, chat.creator_id]))
         .all()
     )
 
     data = [{
         "id": m.id,
         "sender_id": m.sender_id,
-        "sender_name": m.sender.name,
+        "sender_name": names.get(m.sender_id),
         "receiver_id": m.receiver_id,
-        "receiver_name": m.receiver.name,
+        "receiver_name": names.get(m.receiver_id),
         "content": m.content,
-        "is_read": m.is_read,
+        "is_read": is_read(watermarks, m),
         "created_at": m.created_at.isoformat()
     } for m in messages]
 
-    return jsonify({"status": "success", "data": data}), 200
+    return jsonify({
+        "status": "success",
+        "data": data,
+        "paging": {
+            "limit": limit,
+            "has_more": has_more,
+            "before_id": messages[0].id if messages else None,
+            "after_id": messages[-1].id if messages else None
+        }
+    }), 200
+
+
+# -------------------------------------------------
+# SEARCH MESSAGES IN THE CALLER'S CHATS
+# -------------------------------------------------
+@chat_bp.route("/search", methods=["GET"])
+@token_required
+def search(current_user):
+    query = (request.args.get("q") or "").strip()
+
+    if not query:
+        return jsonify({"status": "error", "message": "q is required"}), 400
+
+    limit = request.args.get(
+        "limit", current_app.config["SEARCH_PAGE_SIZE"], type=int
+    )
+    limit = max(1, min(limit, current_app.config["SEARCH_MAX_PAGE_SIZE"]))
+    offset = max(0, request.args.get("offset", 0, type=int))
+
+    if offset > current_app.config["SEARCH_MAX_OFFSET"]:
+        return jsonify({
+            "status": "error",
+            "message": "offset too large, refine the query"
+        }), 400
+
+    rows, has_more = search_messages(current_user.id, query, limit, offset)
+
+    watermarks = read_watermarks({m.chat_id for m, _ in rows})
+    user_ids = {m.sender_id for m, _ in rows} | {m.receiver_id for m, _ in rows}
+    names = dict(
+        db.session.query(User.id, User.name)
+        .filter(User.id.in_(user_ids))
+        .all()
+    ) if user_ids else {}
+
+    data = [{
+        "id": m.id,
+        "chat_id": m.chat_id,
+        "sender_id": m.sender_id,
+        "sender_name": names.get(m.sender_id),
+        "receiver_id": m.receiver_id,
+        "receiver_name": names.get(m.receiver_id),
+        "content": m.content,
+        "is_read": is_read(watermarks, m),
+        "created_at": m.created_at.isoformat(),
+        "matched_terms": matched
+    } for m, matched in rows]
+
+    return jsonify({
+        "status": "success",
+        "data": data,
+        "paging": {
+            "limit": limit,
+            "offset": offset,
+            "has_more": has_more,
+            "next_offset": offset + limit if has_more else None
+        }
+    }), 200
 
 
 # -------------------------------------------------
@@ -240,38 +453,70 @@ def mark_as_read(current_user, chat_id):
     if current_user.id not in [chat.user_id, chat.creator_id]:
         return jsonify({"status": "error", "message": "Access denied"}), 403
 
-    unread_messages = Message.query.filter(
-        Message.chat_id == chat.id,
-        Message.receiver_id == current_user.id,
-        Message.is_read.is_(False)
-    ).all()
+    rows = mark_chats_read(current_user.id, [chat.id])
 
-    if not unread_messages:
+    if not rows:
         return jsonify({"status": "success", "message": "No unread messages"}), 200
 
-    message_ids = []
-
-    for msg in unread_messages:
-        msg.is_read = True
-        message_ids.append(msg.id)
-
-    db.session.commit()
+    _, sender_id, last_read_id, read_count = rows[0]
 
+    # one id instead of a message_ids list: everything up to it is read
     socketio.emit(
         "messages_read",
         {
             "chat_id": chat.id,
             "reader_id": current_user.id,
-            "message_ids": message_ids
+            "last_read_message_id": last_read_id
         },
-        room=f"user_{chat.creator_id if current_user.id == chat.user_id else chat.user_id}"
+        room=f"user_{sender_id}"
     )
 
     return jsonify({
         "status": "success",
         "data": {
             "chat_id": chat.id,
-            "read_count": len(message_ids)
+            "read_count": read_count,
+            "last_read_message_id": last_read_id
+        }
+    }), 200
+
+
+# -------------------------------------------------
+# MARK MANY CHATS (OR THE WHOLE INBOX) AS READ
+# -------------------------------------------------
+@chat_bp.route("/read", methods=["PUT"])
+@token_required
+def mark_many_as_read(current_user):
+    data = request.get_json(silent=True) or {}
+    chat_ids = data.get("chat_ids")
+
+    # no chat_ids means the whole inbox
+    if chat_ids is not None:
+        if not isinstance(chat_ids, list) or not all(isinstance(i, int) for i in chat_ids):
+            return jsonify({
+                "status": "error",
+                "message": "chat_ids must be a list of integers"
+            }), 400
+
+    rows = mark_chats_read(current_user.id, chat_ids)
+    receipts = group_read_receipts(rows)
+
+    # one batched event per chat partner
+    for sender_id, chats in receipts.items():
+        socketio.emit(
+            "messages_read_batch",
+            {"reader_id": current_user.id, "chats": chats},
+            room=f"user_{sender_id}"
+        )
+
+    return jsonify({
+        "status": "success",
+        "data": {
+            "read_count": sum(count for _, _, _, count in rows),
+            "chats": [
+                {"chat_id": chat_id, "read_count": count, "last_read_message_id": last_read_id}
+                for chat_id, _, last_read_id, count in rows
+            ]
         }
     }), 200
 
@@ -282,30 +527,30 @@ def mark_as_read(current_user, chat_id):
 @chat_bp.route("/all-unread-counts", methods=["GET"])
 @token_required
 def all_unread_counts(current_user):
-    chats = Chat.query.filter(
-        (Chat.user_id == current_user.id) |
-        (Chat.creator_id == current_user.id)
-    ).order_by(Chat.id.asc()).all()
-
-    result = []
+    chat_ids = [
+        chat_id for (chat_id,) in
+        db.session.query(Chat.id)
+        .filter(
+            (Chat.user_id == current_user.id) |
+            (Chat.creator_id == current_user.id)
+        )
+        .order_by(Chat.id.asc())
+        .all()
+    ]
 
-    for chat in chats:
-        count = Message.query.filter_by(
-            chat_id=chat.id,
-            receiver_id=current_user.id,
-            is_read=False
-        ).count()
+    unread_counts = get_unread_counts(current_user.id)
 
-        result.append({
-            "chat_id": chat.id,
-            "unread_count": count
-        })
+    result = [{
+        "chat_id": chat_id,
+        "unread_count": unread_counts.get(chat_id, 0)
+    } for chat_id in chat_ids]
 
-        socketio.emit(
-            "unread_count_update",
-            {"chat_id": chat.id, "unread_count": count},
-            room=f"user_{current_user.id}"
-        )
+    # one batched event instead of an unread_count_update per chat
+    socketio.emit(
+        "unread_counts",
+        {"data": result},
+        room=f"user_{current_user.id}"
+    )
 
     return jsonify({
         "status": "success",
@@ -319,14 +564,17 @@ def all_unread_counts(current_user):
 @chat_bp.route("/profile", methods=["GET"])
 @token_required
 def get_profile(current_user):
+    # current_user is a cached snapshot; phone/address live on the row
+    user = User.query.get_or_404(current_user.id)
+
     return jsonify({
         "status": "success",
         "data": {
-            "id": current_user.id,
-            "name": current_user.name,
-            "email": current_user.email,
-            "phone": current_user.phone,
-            "address": current_user.address,
-            "is_verified": current_user.is_verified
+            "id": user.id,
+            "name": user.name,
+            "email": user.email,
+            "phone": user.phone,
+            "address": user.address,
+            "is_verified": user.is_verified
         }
     }), 200
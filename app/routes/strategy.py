@@ -1,7 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from datetime import datetime
-from app.extensions import db, socketio
+import hashlib
+from app.extensions import db
 from app.models import Strategy, Chat
+from app.services.strategy_events import DELETED, UPDATED, is_public, publish_strategy_event
+from app.services.strategy_service import (
+    get_cached_public_page,
+    get_strategy_by_serial,
+    invalidate_public_strategies,
+    invalidate_strategy_ids,
+    public_cache_generation,
+    public_strategies_query,
+    set_cached_public_page
+)
 from app.utils.auth import token_required
 
 strategy_bp = Blueprint("strategy_bp", __name__, url_prefix="/strategy")
@@ -11,26 +22,45 @@ strategy_bp = Blueprint("strategy_bp", __name__, url_prefix="/strategy")
 # -------------------------------------------------
 @strategy_bp.route("/public", methods=["GET"])
 def get_public_strategies():
+    config = current_app.config
+    # clamped so the cache holds a bounded set of pages
     page = request.args.get("page", 1, type=int)
-    per_page = request.args.get("per_page", 10, type=int)
-
-    pagination = Strategy.query.filter(
-        Strategy.status == 1,
-        Strategy.published == 1
-    ).paginate(page=page, per_page=per_page, error_out=False)
-
-    return jsonify({
-        "success": True,
-        "data": [{
-            "id": s.id,
-            "name": s.name,
-            "description": s.description,
-            "capital_required": s.capital_required,
-            "status": int(s.status),
-            "published": int(s.published),
-            "owner_id": s.owner_id
-        } for s in pagination.items]
-    }), 200
+    page = max(1, min(page, config["PUBLIC_STRATEGIES_MAX_PAGE"]))
+    per_page = request.args.get("per_page", config["PUBLIC_STRATEGIES_PAGE_SIZE"], type=int)
+    per_page = max(1, min(per_page, config["PUBLIC_STRATEGIES_MAX_PAGE_SIZE"]))
+
+    # read before querying, so an invalidation during the fill wins
+    generation = public_cache_generation()
+    cached = get_cached_public_page(generation, page, per_page) if generation else None
+    if cached:
+        etag, body = cached
+    else:
+        pagination = public_strategies_query().paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+
+        body = current_app.json.dumps({
+            "success": True,
+            "data": [{
+                "id": s.id,
+                "name": s.name,
+                "description": s.description,
+                "capital_required": s.capital_required,
+                "status": int(s.status),
+                "published": int(s.published),
+                "owner_id": s.owner_id
+            } for s in pagination.items]
+        })
+        etag = hashlib.sha1(body.encode("utf-8")).hexdigest()
+        if generation:
+            set_cached_public_page(generation, page, per_page, etag, body)
+
+    response = Response(body, status=200, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+
+    # 304 with an empty body when If-None-Match matches
+    return response.make_conditional(request)
 
 
 # -------------------------------------------------
@@ -39,14 +69,35 @@ def get_public_strategies():
 @strategy_bp.route("/private", methods=["GET"])
 @token_required
 def get_private_strategies(current_user):
-    strategies = Strategy.query.filter_by(
+    query = Strategy.query.filter_by(
         owner_id=current_user.id
-    ).order_by(Strategy.id.asc()).all()
+    ).order_by(Strategy.id.asc())
+
+    page = request.args.get("page", type=int)
+
+    # Without ?page the full list is returned, as before
+    if page is None:
+        strategies = query.all()
+        offset = 0
+        paging = None
+    else:
+        config = current_app.config
+        per_page = request.args.get("per_page", config["PRIVATE_STRATEGIES_PAGE_SIZE"], type=int)
+        per_page = max(1, min(per_page, config["PRIVATE_STRATEGIES_MAX_PAGE_SIZE"]))
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        strategies = pagination.items
+        offset = (pagination.page - 1) * pagination.per_page
+        paging = {
+            "page": pagination.page,
+            "per_page": pagination.per_page,
+            "total": pagination.total,
+            "pages": pagination.pages
+        }
 
-    return jsonify({
+    response = {
         "success": True,
         "data": [{
-            "id": index + 1,           # 👈 SERIAL NUMBER
+            "id": offset + index + 1,  # 👈 SERIAL NUMBER
             "real_id": s.id,           # internal
             "name": s.name,
             "description": s.description,
@@ -55,7 +106,11 @@ def get_private_strategies(current_user):
             "published": int(s.published),
             "published_at": s.published_at
         } for index, s in enumerate(strategies)]
-    }), 200
+    }
+    if paging:
+        response["paging"] = paging
+
+    return jsonify(response), 200
 
 
 # -------------------------------------------------
@@ -64,15 +119,11 @@ def get_private_strategies(current_user):
 @strategy_bp.route("/<int:strategy_id>", methods=["PUT"])
 @token_required
 def update_strategy(current_user, strategy_id):
-    strategies = Strategy.query.filter_by(
-        owner_id=current_user.id
-    ).order_by(Strategy.id.asc()).all()
-
-    index = strategy_id - 1
-    if index < 0 or index >= len(strategies):
+    strategy = get_strategy_by_serial(current_user.id, strategy_id)
+    if not strategy:
         return jsonify({"status": "error", "message": "Invalid strategy"}), 404
 
-    strategy = strategies[index]
+    was_public = is_public(strategy)
 
     data = request.get_json()
     strategy.name = data.get("name", strategy.name)
@@ -82,7 +133,8 @@ def update_strategy(current_user, strategy_id):
     strategy.published = int(data.get("published", strategy.published))
 
     db.session.commit()
-    socketio.emit("strategy_updated", {"id": strategy.id})
+    invalidate_public_strategies()
+    publish_strategy_event(UPDATED, strategy, {}, was_public)
 
     return jsonify({
         "status": "success",
@@ -92,21 +144,19 @@ def update_strategy(current_user, strategy_id):
 @strategy_bp.route("/<int:strategy_id>/toggle-status", methods=["PATCH"])
 @token_required
 def toggle_strategy_status(current_user, strategy_id):
-    strategies = Strategy.query.filter_by(owner_id=current_user.id).order_by(Strategy.id.asc()).all()
-    index = strategy_id - 1
-
-    if index < 0 or index >= len(strategies):
+    strategy = get_strategy_by_serial(current_user.id, strategy_id)
+    if not strategy:
         return jsonify({"status": "error", "message": "Invalid strategy"}), 404
-
-    strategy = strategies[index]
     status = request.get_json().get("status")
 
     if status not in [0, 1]:
         return jsonify({"status": "error", "message": "status must be 0 or 1"}), 400
 
+    was_public = is_public(strategy)
     strategy.status = status
     db.session.commit()
-    socketio.emit("strategy_updated", {"id": strategy.id, "status": strategy.status})
+    invalidate_public_strategies()
+    publish_strategy_event(UPDATED, strategy, {"status": strategy.status}, was_public)
 
     return jsonify({
         "status": "success",
@@ -116,18 +166,15 @@ def toggle_strategy_status(current_user, strategy_id):
 @strategy_bp.route("/<int:strategy_id>/publish", methods=["PATCH"])
 @token_required
 def toggle_publish_strategy(current_user, strategy_id):
-    strategies = Strategy.query.filter_by(owner_id=current_user.id).order_by(Strategy.id.asc()).all()
-    index = strategy_id - 1
-
-    if index < 0 or index >= len(strategies):
+    strategy = get_strategy_by_serial(current_user.id, strategy_id)
+    if not strategy:
         return jsonify({"status": "error", "message": "Invalid strategy"}), 404
-
-    strategy = strategies[index]
     published = request.get_json().get("published")
 
     if published not in [0, 1]:
         return jsonify({"status": "error", "message": "published must be 0 or 1"}), 400
 
+    was_public = is_public(strategy)
     strategy.published = published
     strategy.published_at = datetime.utcnow() if published else None
     db.session.commit()
@@ -135,11 +182,11 @@ def toggle_publish_strategy(current_user, strategy_id):
     # Convert datetime to ISO string before sending
     published_at_str = strategy.published_at.isoformat() if strategy.published_at else None
 
-    socketio.emit("strategy_updated", {
-        "id": strategy.id,
+    invalidate_public_strategies()
+    publish_strategy_event(UPDATED, strategy, {
         "published": strategy.published,
         "published_at": published_at_str
-    })
+    }, was_public)
 
     return jsonify({
         "status": "success",
@@ -159,21 +206,18 @@ def toggle_publish_strategy(current_user, strategy_id):
 @strategy_bp.route("/<int:strategy_id>", methods=["DELETE"])
 @token_required
 def delete_strategy(current_user, strategy_id):
-    strategies = Strategy.query.filter_by(
-        owner_id=current_user.id
-    ).order_by(Strategy.id.asc()).all()
-
-    index = strategy_id - 1
-    if index < 0 or index >= len(strategies):
+    strategy = get_strategy_by_serial(current_user.id, strategy_id)
+    if not strategy:
         return jsonify({"status": "error", "message": "Invalid strategy"}), 404
 
-    strategy = strategies[index]
-
+    was_public = is_public(strategy)
     Chat.query.filter_by(strategy_id=strategy.id).delete()
     db.session.delete(strategy)
     db.session.commit()
+    invalidate_strategy_ids(current_user.id)
+    invalidate_public_strategies()
 
-    socketio.emit("strategy_deleted", {"id": strategy.id})
+    publish_strategy_event(DELETED, strategy, {}, was_public)
 
     return jsonify({
         "status": "success",
@@ -200,6 +244,9 @@ def create_strategy(current_user):
 
     db.session.add(strategy)
     db.session.commit()
+    invalidate_strategy_ids(current_user.id)
+    if strategy.status == 1 and strategy.published == 1:
+        invalidate_public_strategies()
 
     return jsonify({
         "status": "success",
@@ -3,10 +3,14 @@ from flask_socketio import SocketIO, join_room, leave_room, emit
 from flask import session, request
 import jwt
 from app.extensions import socketio, db
-from app.models import User, Chat, Message
+from app.models import Chat, Strategy
+from app.services.delivery_service import MessageInFlight, deliver_message, validate_client_msg_id
+from app.services.read_service import group_read_receipts, mark_chats_read
+from app.services.strategy_events import PUBLIC_ROOM, is_public, owner_room, strategy_room
+from app.utils.auth import authenticate_token
+from app.utils.rate_limit import check_rate_limit
 from datetime import datetime
-# Replace with your app's secret key
-SECRET_KEY = "jwt-secret-key-123"
+import math
 @socketio.on("connect")
 def connect_socket(auth):  # accept the auth parameter
     # Get token from query string
@@ -16,13 +20,11 @@ def connect_socket(auth):  # accept the auth parameter
     if not token:
         return False
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        user_id = payload.get("user_id")
-    except Exception as e:
+        user = authenticate_token(token)
+    except jwt.InvalidTokenError as e:
         print("JWT decode error:", e)
         return False
 
-    user = User.query.get(user_id)
     if not user:
         return False
 
@@ -81,23 +83,13 @@ def mark_messages_as_read(data):
     if not chat or reader_id not in [chat.user_id, chat.creator_id]:
         return
 
-    # 🔥 Step 3: fetch unread messages
-    unread_messages = Message.query.filter(
-        Message.chat_id == chat_id,
-        Message.receiver_id == reader_id,
-        Message.is_read.is_(False)
-    ).all()
+    # 🔥 Step 3: advance the reader's watermark (one chat-row UPDATE)
+    rows = mark_chats_read(reader_id, [chat_id])
 
-    if not unread_messages:
+    if not rows:
         return
 
-    # 🔥 Step 4: update DB
-    message_ids = []
-    for msg in unread_messages:
-        msg.is_read = True
-        message_ids.append(msg.id)
-
-    db.session.commit()
+    _, sender_id, last_read_id, _ = rows[0]
 
     # 🔔 Step 5: notify sender
     socketio.emit(
@@ -105,11 +97,170 @@ def mark_messages_as_read(data):
         {
             "chat_id": chat_id,
             "reader_id": reader_id,
-            "message_ids": message_ids
+            "last_read_message_id": last_read_id
         },
         room=f"user_{sender_id}"
     )
 
+# -----------------------------
+# MARK MANY CHATS (OR THE WHOLE INBOX) AS READ
+# -----------------------------
+@socketio.on("mark_chats_as_read")
+def mark_chats_as_read(data):
+    reader_id = session.get("user_id")
+    if not reader_id:
+        return
+
+    # no chat_ids means the whole inbox
+    chat_ids = (data or {}).get("chat_ids")
+    if chat_ids is not None:
+        if not isinstance(chat_ids, list) or not all(isinstance(i, int) for i in chat_ids):
+            emit("error", {"status": "error", "message": "chat_ids must be a list of integers"})
+            return
+
+    rows = mark_chats_read(reader_id, chat_ids)
+
+    for sender_id, chats in group_read_receipts(rows).items():
+        socketio.emit(
+            "messages_read_batch",
+            {"reader_id": reader_id, "chats": chats},
+            room=f"user_{sender_id}"
+        )
+
+    emit("chats_marked_read", {
+        "status": "success",
+        "data": {"read_count": sum(count for _, _, _, count in rows)}
+    })
+
+# -----------------------------
+# SEND MESSAGE (ACKED, IDEMPOTENT)
+# -----------------------------
+@socketio.on("send_message")
+def send_message_event(data):
+    """Same as POST /chat/<chat_id>/message over the open socket.
+
+    The return value is the ack: {"status": "success", "data": message,
+    "duplicate": bool} or {"status": "error", "message": ...}.
+    """
+    sender_id = session.get("user_id")
+    if not sender_id:
+        return {"status": "error", "message": "Not authenticated"}
+
+    # same per-user budget as POST /chat/<chat_id>/message
+    allowed, retry_after = check_rate_limit("send_message", "user", sender_id)
+    if not allowed:
+        return {
+            "status": "error",
+            "message": "Too many requests. Please try again later.",
+            "retry_after": max(1, math.ceil(retry_after))
+        }
+
+    data = data or {}
+    chat_id = data.get("chat_id")
+    content = data.get("content")
+    client_msg_id = data.get("client_msg_id")
+
+    if not isinstance(chat_id, int):
+        return {"status": "error", "message": "chat_id must be an integer"}
+    if not content or not isinstance(content, str):
+        return {"status": "error", "message": "Content is required"}
+    error = validate_client_msg_id(client_msg_id)
+    if error:
+        return {"status": "error", "message": error}
+
+    # participants only; no full Chat row needed
+    chat = (
+        db.session.query(Chat.id, Chat.creator_id, Chat.user_id)
+        .filter(Chat.id == chat_id)
+        .first()
+    )
+    if not chat:
+        return {"status": "error", "message": "Chat not found"}
+    if sender_id not in [chat.user_id, chat.creator_id]:
+        return {"status": "error", "message": "Access denied"}
+
+    try:
+        message_data, duplicate = deliver_message(
+            chat, sender_id, session.get("user_name"), content, client_msg_id
+        )
+    except MessageInFlight:
+        return {
+            "status": "error",
+            "message": "A message with this client_msg_id is still being sent"
+        }
+
+    return {"status": "success", "data": message_data, "duplicate": duplicate}
+
+# -----------------------------
+# STRATEGY TOPIC SUBSCRIPTIONS
+# -----------------------------
+def _strategy_rooms(data, user_id):
+    """Rooms asked for in a (un)subscribe payload, or an error message.
+
+    {"public": true, "mine": true, "strategy_ids": [1, 2]}; a single
+    strategy is only visible when it is public or owned by the user.
+    """
+    data = data or {}
+    rooms = []
+
+    if data.get("public"):
+        rooms.append(PUBLIC_ROOM)
+    if data.get("mine"):
+        rooms.append(owner_room(user_id))
+
+    strategy_ids = data.get("strategy_ids") or []
+    if not isinstance(strategy_ids, list) or not all(isinstance(i, int) for i in strategy_ids):
+        return None, "strategy_ids must be a list of integers"
+
+    if strategy_ids:
+        visible = (
+            db.session.query(Strategy.id, Strategy.owner_id, Strategy.status, Strategy.published)
+            .filter(Strategy.id.in_(strategy_ids))
+            .all()
+        )
+        rooms.extend(
+            strategy_room(s.id) for s in visible
+            if s.owner_id == user_id or is_public(s)
+        )
+
+    return rooms, None
+
+
+@socketio.on("subscribe_strategies")
+def subscribe_strategies(data):
+    user_id = session.get("user_id")
+    if not user_id:
+        return {"status": "error", "message": "Not authenticated"}
+
+    rooms, error = _strategy_rooms(data, user_id)
+    if error:
+        return {"status": "error", "message": error}
+
+    for room in rooms:
+        join_room(room)
+
+    return {"status": "success", "data": {"rooms": rooms}}
+
+
+@socketio.on("unsubscribe_strategies")
+def unsubscribe_strategies(data):
+    user_id = session.get("user_id")
+    if not user_id:
+        return {"status": "error", "message": "Not authenticated"}
+
+    data = data or {}
+    rooms = []
+    if data.get("public"):
+        rooms.append(PUBLIC_ROOM)
+    if data.get("mine"):
+        rooms.append(owner_room(user_id))
+    rooms.extend(strategy_room(i) for i in data.get("strategy_ids") or [] if isinstance(i, int))
+
+    for room in rooms:
+        leave_room(room)
+
+    return {"status": "success", "data": {"rooms": rooms}}
+
 # -----------------------------
 # SOCKET DISCONNECT
 # -----------------------------
@@ -0,0 +1,74 @@
+# app/runtime.py
+#
+# Startup self-check for production launches (app.py, `flask self-check`).
+# Each check returns (name, ok, detail); the launcher refuses to start the
+# server if any check fails.
+
+import importlib
+from sqlalchemy import text
+from app.extensions import db, redis_client
+
+DEFAULT_SECRET_KEY = "jwt-secret-key-123"
+
+
+def _check_database():
+    with db.engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    pool = db.engine.pool
+    return f"{db.engine.dialect.name}, {pool.__class__.__name__} {pool.status()}"
+
+
+def _check_redis():
+    redis_client.ping()
+    pool = redis_client.connection_pool
+    return f"max_connections={pool.max_connections}"
+
+
+def _check_message_queue(url):
+    import redis
+    redis.StrictRedis.from_url(url, socket_connect_timeout=2).ping()
+    return url
+
+
+def self_check(app):
+    results = []
+
+    def run(name, fn, *args):
+        try:
+            results.append((name, True, fn(*args)))
+        except Exception as e:
+            results.append((name, False, str(e)))
+
+    with app.app_context():
+        run("database", _check_database)
+        run("redis", _check_redis)
+
+    if app.config["SOCKETIO_MESSAGE_QUEUE"]:
+        run("socketio message queue", _check_message_queue, app.config["SOCKETIO_MESSAGE_QUEUE"])
+
+    async_mode = app.config["ASYNC_MODE"]
+    production = app.config["SERVER_MODE"] == "production"
+
+    if async_mode in ("eventlet", "gevent"):
+        try:
+            importlib.import_module(async_mode)
+            results.append(("async mode", True, async_mode))
+        except ImportError as e:
+            results.append(("async mode", False, f"{async_mode} is not installed: {e}"))
+    elif production:
+        results.append(("async mode", False,
+                         f"{async_mode!r} uses the development server; set ASYNC_MODE=eventlet or gevent"))
+    else:
+        results.append(("async mode", True, async_mode))
+
+    if production:
+        results.append((
+            "secret key",
+            app.config["SECRET_KEY"] != DEFAULT_SECRET_KEY,
+            "set JWT_SECRET_KEY in production"
+            if app.config["SECRET_KEY"] == DEFAULT_SECRET_KEY else "set"
+        ))
+        results.append(("debug", not app.debug, "debug must be off in production"
+                        if app.debug else "off"))
+
+    return results
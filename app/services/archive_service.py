@@ -0,0 +1,236 @@
+# app/services/archive_service.py
+#
+# Hot/cold tiering for chat messages. `flask archive-messages` moves each
+# chat's messages older than ARCHIVE_AFTER_DAYS out of the `message` table
+# into zlib-compressed blocks in `message_archive`, so the hot table (and
+# its indexes) only holds recent history. GET /chat/<id>/messages reads
+# through to the archive once a page runs past the hot range.
+#
+# Archived messages are always older than a chat's hot ones: a chat is
+# archived from its oldest message forward and stops at the first message
+# above its receiver's read watermark, so unread counts and read marking
+# never need the archive.
+# Archived messages leave the search index.
+
+import json
+import zlib
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import delete, func
+from ..extensions import db
+from ..models import Chat, Message, MessageArchive, MessageTerm
+
+ArchivedMessage = namedtuple(
+    "ArchivedMessage",
+    "id chat_id sender_id receiver_id content is_read created_at"
+)
+
+_COLUMNS = (
+    Message.id, Message.chat_id, Message.sender_id, Message.receiver_id,
+    Message.content, Message.created_at
+)
+
+
+def _pack(rows):
+    # archiving stops at the first unread message, so everything is read
+    return zlib.compress(json.dumps([
+        [r.id, r.sender_id, r.receiver_id, r.content, True, r.created_at.isoformat()]
+        for r in rows
+    ]).encode(), 6)
+
+
+def _unpack(block):
+    return [
+        ArchivedMessage(message_id, block.chat_id, sender_id, receiver_id,
+                        content, is_read, datetime.fromisoformat(created_at))
+        for message_id, sender_id, receiver_id, content, is_read, created_at
+        in json.loads(zlib.decompress(block.payload))
+    ]
+
+
+def _before(created_at, message_id, cursor):
+    return (created_at < cursor.created_at) | (
+        (created_at == cursor.created_at) & (message_id < cursor.id)
+    )
+
+
+def _after(created_at, message_id, cursor):
+    return (created_at > cursor.created_at) | (
+        (created_at == cursor.created_at) & (message_id > cursor.id)
+    )
+
+
+def _key(message):
+    return (message.created_at, message.id)
+
+
+# -------------------------------------------------
+# ARCHIVING
+# -------------------------------------------------
+def archive_chat(chat_id, cutoff, block_size=500):
+    """Archive one chat's messages older than cutoff; returns the count."""
+    chat = db.session.get(Chat, chat_id)
+    if chat is None:
+        # messages left behind by a deleted chat have no watermarks to
+        # tell read from unread; leave them where they are
+        return 0
+
+    first_unread = (
+        db.session.query(Message.created_at, Message.id)
+        .filter(
+            Message.chat_id == chat_id,
+            ((Message.receiver_id == chat.creator_id) & (Message.id > chat.creator_last_read_id)) |
+            ((Message.receiver_id == chat.user_id) & (Message.id > chat.user_last_read_id))
+        )
+        .order_by(Message.created_at.asc(), Message.id.asc())
+        .first()
+    )
+
+    conditions = [Message.chat_id == chat_id, Message.created_at < cutoff]
+    if first_unread:
+        conditions.append(_before(Message.created_at, Message.id, first_unread))
+
+    archived = 0
+    while True:
+        rows = (
+            db.session.query(*_COLUMNS)
+            .filter(*conditions)
+            .order_by(Message.created_at.asc(), Message.id.asc())
+            .limit(block_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        ids = [r.id for r in rows]
+        db.session.add(MessageArchive(
+            chat_id=chat_id,
+            first_created_at=rows[0].created_at,
+            first_message_id=rows[0].id,
+            last_created_at=rows[-1].created_at,
+            last_message_id=rows[-1].id,
+            min_message_id=min(ids),
+            max_message_id=max(ids),
+            message_count=len(rows),
+            payload=_pack(rows)
+        ))
+        db.session.execute(delete(MessageTerm).where(MessageTerm.message_id.in_(ids)))
+        db.session.execute(delete(Message).where(Message.id.in_(ids)))
+        # one block per transaction: a crash never leaves a message in both tiers
+        db.session.commit()
+
+        archived += len(rows)
+        if len(rows) < block_size:
+            break
+
+    return archived
+
+
+def archive_messages(cutoff, block_size=500, log=print):
+    """Archive every chat; returns (chats_touched, messages_archived)."""
+    chat_ids = [
+        chat_id for (chat_id,) in
+        db.session.query(Message.chat_id)
+        .filter(Message.created_at < cutoff)
+        .distinct()
+        .all()
+    ]
+
+    total = 0
+    chats = 0
+    for chat_id in chat_ids:
+        count = archive_chat(chat_id, cutoff, block_size)
+        if count:
+            chats += 1
+            total += count
+            log(f"… chat {chat_id}: archived {count} messages")
+
+    return chats, total
+
+
+# -------------------------------------------------
+# READ-THROUGH FOR GET /chat/<id>/messages
+# -------------------------------------------------
+def find_archived(chat_id, message_id):
+    """The archived message with this id, or None."""
+    blocks = MessageArchive.query.filter(
+        MessageArchive.chat_id == chat_id,
+        MessageArchive.min_message_id <= message_id,
+        MessageArchive.max_message_id >= message_id
+    ).all()
+
+    for block in blocks:
+        for message in _unpack(block):
+            if message.id == message_id:
+                return message
+    return None
+
+
+def _load_blocks(query, order, need):
+    """Fetch just enough blocks (in order) to cover `need` messages."""
+    picked = []
+    covered = 0
+    rows = query.with_entities(MessageArchive.id, MessageArchive.message_count).order_by(*order)
+    for block_id, count in rows:
+        # the first block may straddle the cursor, so it doesn't count
+        if picked:
+            covered += count
+        picked.append(block_id)
+        if covered >= need:
+            break
+
+    if not picked:
+        return []
+
+    blocks = {b.id: b for b in MessageArchive.query.filter(MessageArchive.id.in_(picked)).all()}
+    return [blocks[block_id] for block_id in picked]
+
+
+def archived_before(chat_id, cursor, limit):
+    """Up to `limit` archived messages older than cursor, newest first.
+
+    cursor is anything with created_at and id, or None for the newest.
+    """
+    query = MessageArchive.query.filter(MessageArchive.chat_id == chat_id)
+    if cursor is not None:
+        query = query.filter(_before(
+            MessageArchive.first_created_at, MessageArchive.first_message_id, cursor
+        ))
+
+    order = (MessageArchive.last_created_at.desc(), MessageArchive.last_message_id.desc())
+
+    messages = []
+    for block in _load_blocks(query, order, limit):
+        rows = _unpack(block)
+        if cursor is not None:
+            rows = [m for m in rows if _key(m) < _key(cursor)]
+        messages.extend(reversed(rows))
+
+    messages.sort(key=_key, reverse=True)
+    return messages[:limit]
+
+
+def archived_after(chat_id, cursor, limit):
+    """Up to `limit` archived messages newer than cursor, oldest first."""
+    query = MessageArchive.query.filter(
+        MessageArchive.chat_id == chat_id,
+        _after(MessageArchive.last_created_at, MessageArchive.last_message_id, cursor)
+    )
+
+    order = (MessageArchive.first_created_at.asc(), MessageArchive.first_message_id.asc())
+
+    messages = []
+    for block in _load_blocks(query, order, limit):
+        messages.extend(m for m in _unpack(block) if _key(m) > _key(cursor))
+
+    messages.sort(key=_key)
+    return messages[:limit]
+
+
+def archive_stats():
+    """(blocks, messages, compressed_bytes) currently in the archive."""
+    return db.session.query(
+        func.count(MessageArchive.id),
+        func.coalesce(func.sum(MessageArchive.message_count), 0),
+        func.coalesce(func.sum(func.length(MessageArchive.payload)), 0)
+    ).one()
@@ -0,0 +1,124 @@
+# app/services/delivery_service.py
+#
+# The send path shared by POST /chat/<chat_id>/message and the
+# `send_message` socket event: idempotency check, persistence
+# (message_service), the receiver's unread counter and the new_message
+# fan-out to both participants.
+#
+# Idempotency keys are client-supplied per sender and kept in Redis:
+#   msg_idem:{sender_id}:{client_msg_id} -> "pending" | message JSON
+# A retried send returns the stored message instead of writing it twice.
+
+import json
+import redis
+from flask import current_app
+from ..extensions import db, redis_client, socketio
+from ..models import User
+from .message_service import store_message
+from .unread_service import increment_unread
+
+PENDING = "pending"
+MAX_CLIENT_MSG_ID_LENGTH = 64
+
+
+class MessageInFlight(Exception):
+    """The same idempotency key is being sent right now."""
+
+
+def idempotency_key(sender_id, client_msg_id):
+    return f"msg_idem:{sender_id}:{client_msg_id}"
+
+
+def _claim(key):
+    """Return (claimed, stored_message) for an idempotency key.
+
+    Without Redis the send goes ahead unguarded rather than failing.
+    """
+    try:
+        pipe = redis_client.pipeline()
+        pipe.set(key, PENDING, nx=True, ex=current_app.config["MESSAGE_IDEMPOTENCY_PENDING_TTL"])
+        pipe.get(key)
+        claimed, stored = pipe.execute()
+    except redis.RedisError as e:
+        print("❌ Error checking message idempotency key:", e)
+        return True, None
+
+    if claimed:
+        return True, None
+    if stored is None or stored == PENDING:
+        raise MessageInFlight()
+    return False, json.loads(stored)
+
+
+def _remember(key, message_data):
+    try:
+        redis_client.set(
+            key, json.dumps(message_data),
+            ex=current_app.config["MESSAGE_IDEMPOTENCY_TTL"]
+        )
+    except redis.RedisError as e:
+        print("❌ Error storing message idempotency key:", e)
+
+
+def _release(key):
+    try:
+        redis_client.delete(key)
+    except redis.RedisError as e:
+        print("❌ Error releasing message idempotency key:", e)
+
+
+def deliver_message(chat, sender_id, sender_name, content, client_msg_id=None):
+    """Store and fan out one message; returns (message_data, duplicate).
+
+    chat needs id, creator_id and user_id (a Chat or a column row).
+    Raises MessageInFlight if client_msg_id is already being sent.
+    """
+    key = idempotency_key(sender_id, client_msg_id) if client_msg_id else None
+    if key:
+        claimed, stored = _claim(key)
+        if not claimed:
+            return stored, True
+
+    receiver_id = chat.creator_id if sender_id == chat.user_id else chat.user_id
+
+    try:
+        receiver_name = db.session.query(User.name).filter(User.id == receiver_id).scalar()
+        message = store_message(chat.id, sender_id, receiver_id, content)
+    except Exception:
+        # nothing was written: let the client retry with the same key
+        if key:
+            _release(key)
+        raise
+
+    increment_unread(receiver_id, message["chat_id"])
+
+    message_data = {
+        "message_id": message["id"],
+        "chat_id": message["chat_id"],
+        "sender_id": message["sender_id"],
+        "sender_name": sender_name,
+        "receiver_id": message["receiver_id"],
+        "receiver_name": receiver_name,
+        "content": message["content"],
+        "created_at": message["created_at"].isoformat(),
+        "is_read": message["is_read"]
+    }
+    if client_msg_id:
+        message_data["client_msg_id"] = client_msg_id
+
+    if key:
+        _remember(key, message_data)
+
+    for uid in {sender_id, receiver_id}:
+        socketio.emit("new_message", message_data, room=f"user_{uid}")
+
+    return message_data, False
+
+
+def validate_client_msg_id(client_msg_id):
+    """None if acceptable (absent or a short string), else an error message."""
+    if client_msg_id is None:
+        return None
+    if not isinstance(client_msg_id, str) or not 0 < len(client_msg_id) <= MAX_CLIENT_MSG_ID_LENGTH:
+        return f"client_msg_id must be a string of 1-{MAX_CLIENT_MSG_ID_LENGTH} characters"
+    return None
@@ -1,34 +1,249 @@
+import queue
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from flask import render_template
 from ..config import Config
 
+
+def build_otp_message(email, otp, name="User"):
+    message = MIMEMultipart("alternative")
+    message["Subject"] = "Your OTP Code"
+    message["From"] = Config.EMAIL_USER
+    message["To"] = email
+
+    # Render HTML template
+    html_content = render_template(
+        "otp_email.html",
+        otp=otp,
+        name=name
+    )
+
+    message.attach(MIMEText(html_content, "html"))
+    return message
+
+
+# -------------------------------------------------
+# SMTP CONNECTION POOL
+# -------------------------------------------------
+class SMTPConnectionPool:
+    """Keeps logged-in SMTP connections open between sends.
+
+    Idle connections are closed after ``idle_timeout`` seconds; a connection
+    the server has dropped is detected with NOOP and replaced.
+    """
+
+    def __init__(self, host, port, user=None, password=None, use_tls=True,
+                 size=2, idle_timeout=60, timeout=10):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)   # (server, last_used)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        return server
+
+    def acquire(self):
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if time.monotonic() - last_used > self.idle_timeout:
+                self._close(server)
+                continue
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self._close(server)
+
+    def release(self, server, broken=False):
+        if broken:
+            self._close(server)
+            return
+        try:
+            self._idle.put_nowait((server, time.monotonic()))
+        except queue.Full:
+            self._close(server)
+
+    def close_all(self):
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+
+# -------------------------------------------------
+# BACKGROUND DELIVERY WORKER
+# -------------------------------------------------
+class EmailDeliveryWorker:
+    """Sends queued messages from a daemon thread.
+
+    Messages waiting in the queue are sent in batches over one pooled
+    connection; a failed batch is retried with exponential backoff.
+    """
+
+    def __init__(self, pool, batch_size=20, max_retries=3, backoff=1.0):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sent = 0
+        self.failed = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="email-delivery", daemon=True
+                )
+                self._thread.start()
+
+    def enqueue(self, to_addr, message):
+        self.start()
+        self._queue.put((to_addr, message))
+
+    def join(self):
+        """Block until every queued message has been handled."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                # never let one bad batch kill the delivery thread
+                print("❌ Email delivery worker error:", e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, batch):
+        pending = list(batch)
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+            try:
+                server = self.pool.acquire()
+            except (smtplib.SMTPException, OSError) as e:
+                print("❌ Error connecting to SMTP server:", e)
+                continue
+
+            broken = False
+            try:
+                while pending:
+                    to_addr, message = pending[0]
+                    try:
+                        server.sendmail(message["From"], to_addr, message.as_string())
+                        self.sent += 1
+                        print(f"✅ OTP email sent to {to_addr}")
+                    except smtplib.SMTPRecipientsRefused as e:
+                        # permanent for this recipient, connection still usable
+                        print("❌ Error sending email:", e)
+                        self.failed += 1
+                    except (smtplib.SMTPException, OSError) as e:
+                        print("❌ Error sending email:", e)
+                        broken = True
+                        break
+                    pending.pop(0)
+            except Exception:
+                # connection state unknown: don't hand it to the next send
+                broken = True
+                self.failed += len(pending)
+                raise
+            finally:
+                self.pool.release(server, broken=broken)
+
+            if not pending:
+                return
+
+        self.failed += len(pending)
+        for to_addr, _ in pending:
+            print(f"❌ Giving up on OTP email to {to_addr}")
+
+
+smtp_pool = SMTPConnectionPool(
+    Config.EMAIL_HOST,
+    Config.EMAIL_PORT,
+    user=Config.EMAIL_USER,
+    password=Config.EMAIL_PASS,
+    use_tls=Config.EMAIL_USE_TLS,
+    size=Config.EMAIL_POOL_SIZE,
+    idle_timeout=Config.EMAIL_IDLE_TIMEOUT
+)
+
+email_worker = EmailDeliveryWorker(
+    smtp_pool,
+    batch_size=Config.EMAIL_BATCH_SIZE,
+    max_retries=Config.EMAIL_MAX_RETRIES,
+    backoff=Config.EMAIL_RETRY_BACKOFF
+)
+
+
+def queue_otp_email(email, otp, name="User"):
+    """Render now (needs the app context) and hand off to the worker."""
+    try:
+        message = build_otp_message(email, otp, name)
+    except Exception as e:
+        print("❌ Error building email:", e)
+        return False
+
+    email_worker.enqueue(email, message)
+    return True
+
+
 def send_otp_email(email, otp, name="User"):
     try:
-        message = MIMEMultipart("alternative")
-        message["Subject"] = "Your OTP Code"
-        message["From"] = Config.EMAIL_USER
-        message["To"] = email
-
-        # Render HTML template
-        html_content = render_template(
-            "otp_email.html",
-            otp=otp,
-            name=name
-        )
-
-        message.attach(MIMEText(html_content, "html"))
-
-        server = smtplib.SMTP(Config.EMAIL_HOST, Config.EMAIL_PORT)
-        server.starttls()
-        server.login(Config.EMAIL_USER, Config.EMAIL_PASS)
-        server.sendmail(
-            Config.EMAIL_USER,
-            email,
-            message.as_string()
-        )
-        server.quit()
+        message = build_otp_message(email, otp, name)
+
+        server = smtp_pool.acquire()
+        try:
+            server.sendmail(
+                Config.EMAIL_USER,
+                email,
+                message.as_string()
+            )
+        except Exception:
+            smtp_pool.release(server, broken=True)
+            raise
+        smtp_pool.release(server)
 
         print(f"✅ OTP email sent to {email}")
         return True
@@ -36,4 +251,3 @@ def send_otp_email(email, otp, name="User"):
     except Exception as e:
         print("❌ Error sending email:", e)
         return False
-
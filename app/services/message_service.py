@@ -0,0 +1,215 @@
+# app/services/message_service.py
+#
+# Persistence for POST /chat/<chat_id>/message. By default every message is
+# its own transaction. With CHAT_GROUP_COMMIT enabled, concurrent senders
+# are collected for up to CHAT_GROUP_COMMIT_MAX_WAIT_MS (or until
+# CHAT_GROUP_COMMIT_MAX_BATCH messages) and written in one transaction, so
+# a burst pays for a single commit/fsync instead of one per message.
+# Search index terms (search_service) are written in the same transaction.
+
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import bindparam, insert, or_, update
+from ..extensions import db
+from ..models import Chat, Message
+from .search_service import index_messages
+
+LAST_MESSAGE_PREVIEW_LENGTH = 255
+
+
+def _chat_pointer(values):
+    return {
+        "updated_at": values["created_at"],
+        "last_message_id": values["id"],
+        "last_message_sender_id": values["sender_id"],
+        "last_message_preview": values["content"][:LAST_MESSAGE_PREVIEW_LENGTH]
+    }
+
+
+def _newer_than_pointer(message_id):
+    # a concurrent send that committed a later message keeps the pointer
+    return or_(Chat.last_message_id.is_(None), Chat.last_message_id < message_id)
+
+
+def _store_single(values):
+    message = Message(**values)
+    db.session.add(message)
+    db.session.flush()
+
+    # 🔥 bump chat to top and keep the inbox pointer current
+    pointer = _chat_pointer({**values, "id": message.id})
+    Chat.query.filter(
+        Chat.id == values["chat_id"], _newer_than_pointer(message.id)
+    ).update(pointer)
+
+    index_messages(db.session, [(message.id, values["chat_id"], values["content"])])
+
+    db.session.commit()
+    return message.id
+
+
+class GroupCommitter:
+    """Leader/follower group commit.
+
+    The first caller to arrive becomes the leader: it waits up to
+    ``max_wait`` seconds for others to queue up, writes the batch and
+    wakes everyone. Callers stay in their own threads, so no background
+    worker needs an app context.
+    """
+
+    def __init__(self, max_batch=64, max_wait=0.005):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.messages = 0
+        self._cond = threading.Condition()
+        self._queue = []
+        self._leader = None
+
+    def submit(self, values):
+        item = _PendingWrite(values)
+
+        with self._cond:
+            self._queue.append(item)
+            if self._leader is None:
+                self._leader = item
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+
+            while self._leader is not item and not item.done:
+                self._cond.wait()
+            if item.done:
+                return item.result()
+
+            deadline = time.monotonic() + self.max_wait
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._queue[:self.max_batch]
+            del self._queue[:self.max_batch]
+            # hand leadership to whoever is left, they start the next batch
+            self._leader = self._queue[0] if self._queue else None
+            self._cond.notify_all()
+
+        try:
+            ids = self._write(batch)
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+        else:
+            for pending, message_id in zip(batch, ids):
+                pending.message_id = message_id
+
+        with self._cond:
+            for pending in batch:
+                pending.done = True
+            self.batches += 1
+            self.messages += len(batch)
+            self._cond.notify_all()
+
+        return item.result()
+
+    def _write(self, batch):
+        rows = [pending.values for pending in batch]
+
+        with db.engine.begin() as conn:
+            if conn.dialect.insert_executemany_returning_sort_by_parameter_order:
+                # one multi-row INSERT ... RETURNING (SQLite, PostgreSQL, MariaDB)
+                ids = conn.execute(
+                    insert(Message).returning(Message.id, sort_by_parameter_order=True),
+                    rows
+                ).scalars().all()
+            else:
+                # MySQL cannot return ids for a multi-row INSERT; still one
+                # transaction, so still one commit for the whole batch
+                ids = [
+                    conn.execute(insert(Message), row).inserted_primary_key[0]
+                    for row in rows
+                ]
+
+            # newest message per chat becomes the inbox pointer
+            pointers = {}
+            for row, message_id in zip(rows, ids):
+                pointers[row["chat_id"]] = {
+                    "b_chat_id": row["chat_id"],
+                    **{f"b_{k}": v for k, v in _chat_pointer({**row, "id": message_id}).items()}
+                }
+
+            conn.execute(
+                update(Chat)
+                .where(
+                    Chat.id == bindparam("b_chat_id"),
+                    _newer_than_pointer(bindparam("b_last_message_id"))
+                )
+                .values(
+                    updated_at=bindparam("b_updated_at"),
+                    last_message_id=bindparam("b_last_message_id"),
+                    last_message_sender_id=bindparam("b_last_message_sender_id"),
+                    last_message_preview=bindparam("b_last_message_preview")
+                ),
+                list(pointers.values())
+            )
+
+            index_messages(conn, [
+                (message_id, row["chat_id"], row["content"])
+                for row, message_id in zip(rows, ids)
+            ])
+
+        return ids
+
+
+class _PendingWrite:
+    __slots__ = ("values", "done", "message_id", "error")
+
+    def __init__(self, values):
+        self.values = values
+        self.done = False
+        self.message_id = None
+        self.error = None
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.message_id
+
+
+_group_committer = None
+_group_committer_lock = threading.Lock()
+
+
+def get_group_committer():
+    global _group_committer
+    with _group_committer_lock:
+        if _group_committer is None:
+            _group_committer = GroupCommitter(
+                max_batch=current_app.config["CHAT_GROUP_COMMIT_MAX_BATCH"],
+                max_wait=current_app.config["CHAT_GROUP_COMMIT_MAX_WAIT_MS"] / 1000.0
+            )
+        return _group_committer
+
+
+def store_message(chat_id, sender_id, receiver_id, content):
+    """Persist a message and update its chat; returns the stored values."""
+    values = {
+        "chat_id": chat_id,
+        "sender_id": sender_id,
+        "receiver_id": receiver_id,
+        "content": content,
+        "created_at": datetime.utcnow(),
+        "is_read": False
+    }
+
+    if current_app.config["CHAT_GROUP_COMMIT"]:
+        # end the request's read transaction: the batch uses its own
+        # connection, and an open reader would hold up SQLite writers
+        db.session.rollback()
+        message_id = get_group_committer().submit(values)
+    else:
+        message_id = _store_single(values)
+
+    return {"id": message_id, **values}
@@ -4,31 +4,82 @@ import random
 from ..extensions import redis_client
 from ..config import Config
 
+# Each OTP operation is a single server-side script: one round trip, and no
+# other client can interleave between the read and the writes.
+
+# KEYS: otp, resend lock, attempts   ARGV: otp, expiry, lock seconds, force
+GENERATE_SCRIPT = """
+if ARGV[4] == '0' and redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('SET', KEYS[2], '1', 'EX', ARGV[3])
+redis.call('SET', KEYS[3], '0', 'EX', ARGV[2])
+return 1
+"""
+
+# KEYS: otp, attempts   ARGV: otp, max attempts, count failure
+# Returns 1 if the OTP matched (and is consumed), 0 otherwise.
+VERIFY_SCRIPT = """
+local stored = redis.call('GET', KEYS[1])
+if stored and stored == ARGV[1] then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return 1
+end
+if stored and ARGV[3] == '1' then
+    local attempts = redis.call('INCR', KEYS[2])
+    if attempts > tonumber(ARGV[2]) then
+        redis.call('DEL', KEYS[1], KEYS[2])
+    end
+end
+return 0
+"""
+
+RESEND_LOCK_SECONDS = 30
+
+# Registered on first use, so importing this module doesn't build the client
+_scripts = {}
+
+
+def _script(source):
+    if source not in _scripts:
+        _scripts[source] = redis_client.register_script(source)
+    return _scripts[source]
+
+
+def _keys(email: str):
+    return [f"otp:{email}", f"otp_resend_lock:{email}", f"otp_attempts:{email}"]
+
+
+def _new_otp() -> str:
+    return str(random.randint(100000, 999999))
+
+
 def generate_and_store_otp(email: str) -> str:
-    otp = str(random.randint(100000, 999999))
-    redis_client.setex(f"otp:{email}", Config.OTP_EXPIRY, otp)
-    redis_client.setex(f"otp_resend_lock:{email}", 30, "1")  # 30 seconds lock
-    redis_client.setex(f"otp_attempts:{email}", Config.OTP_EXPIRY, 0)
+    otp = _new_otp()
+    _script(GENERATE_SCRIPT)(
+        keys=_keys(email),
+        args=[otp, Config.OTP_EXPIRY, RESEND_LOCK_SECONDS, 1]
+    )
     return otp
 
-def can_resend_otp(email: str) -> bool:
-    return not redis_client.exists(f"otp_resend_lock:{email}")
-
-def verify_otp(email: str, otp: str) -> bool:
-    stored_otp = redis_client.get(f"otp:{email}")
-    if not stored_otp:
-        return False
-    stored_otp = stored_otp.decode() if isinstance(stored_otp, bytes) else stored_otp
-    if stored_otp == otp:
-        redis_client.delete(f"otp:{email}")
-        redis_client.delete(f"otp_attempts:{email}")
-        return True
-    return False
-
-def increment_attempt(email: str) -> bool:
-    attempts = redis_client.incr(f"otp_attempts:{email}")
-    if attempts > 3:
-        redis_client.delete(f"otp:{email}")
-        redis_client.delete(f"otp_attempts:{email}")
-        return False
-    return True
+
+def resend_otp_if_allowed(email: str):
+    """Generate a new OTP unless the resend lock is held; None if locked."""
+    otp = _new_otp()
+    stored = _script(GENERATE_SCRIPT)(
+        keys=_keys(email),
+        args=[otp, Config.OTP_EXPIRY, RESEND_LOCK_SECONDS, 0]
+    )
+    return otp if stored else None
+
+
+def verify_otp(email: str, otp: str, count_attempt: bool = False) -> bool:
+    """Check and consume the OTP; with count_attempt, a mismatch also
+    counts towards the lockout in the same round trip."""
+    otp_key, _, attempts_key = _keys(email)
+    return bool(_script(VERIFY_SCRIPT)(
+        keys=[otp_key, attempts_key],
+        args=[otp, Config.OTP_MAX_ATTEMPTS, 1 if count_attempt else 0]
+    ))
+
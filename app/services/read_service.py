@@ -0,0 +1,124 @@
+# app/services/read_service.py
+#
+# Read state as per-participant watermarks on the chat row
+# (Chat.creator_last_read_id / Chat.user_last_read_id): a message is read
+# once its receiver's watermark reaches its id. Marking a chat read is one
+# chat-row update, however many messages it covers; `message` rows are
+# never rewritten. Shared by the REST routes and socket handlers.
+
+from datetime import datetime
+from sqlalchemy import bindparam, func, select, update
+from ..extensions import db
+from ..models import Chat, Message
+from .unread_service import reader_watermark, subtract_unread
+
+
+def unread_by_chat_query(reader_id, chat_ids):
+    """(chat_id, creator_id, user_id, max id, count) of the reader's unread
+    messages per chat; one grouped range seek on ix_message_chat_receiver_id.
+    chat_ids is a list or a subquery."""
+    return db.session.query(
+        Message.chat_id,
+        Chat.creator_id,
+        Chat.user_id,
+        func.max(Message.id),
+        func.count(Message.id)
+    ).join(Chat, Chat.id == Message.chat_id).filter(
+        Message.chat_id.in_(chat_ids),
+        Message.receiver_id == reader_id,
+        Message.id > reader_watermark(reader_id)
+    ).group_by(Message.chat_id, Chat.creator_id, Chat.user_id)
+
+
+def mark_chats_read(reader_id, chat_ids=None):
+    """Advance the reader's watermark to their newest received message,
+    in the given chats or in the whole inbox when chat_ids is None.
+
+    Returns [(chat_id, sender_id, last_read_message_id, read_count), ...]
+    for chats that had unread messages. Chats the reader is not a
+    participant in simply match nothing.
+    """
+    if chat_ids is not None and not chat_ids:
+        return []
+
+    if chat_ids is None:
+        chat_ids = select(Chat.id).where(
+            (Chat.creator_id == reader_id) | (Chat.user_id == reader_id)
+        ).scalar_subquery()
+
+    unread = unread_by_chat_query(reader_id, chat_ids).all()
+
+    if not unread:
+        return []
+
+    now = datetime.utcnow()
+    sides = {"creator": [], "user": []}
+    rows = []
+    for chat_id, creator_id, user_id, last_id, count in unread:
+        side = "creator" if creator_id == reader_id else "user"
+        sides[side].append({"b_chat_id": chat_id, "b_last_read_id": last_id})
+        rows.append((chat_id, user_id if side == "creator" else creator_id, last_id, count))
+
+    # watermarks only move forward, even if two readers race; Core table
+    # UPDATE so executemany keeps the custom WHERE. updated_at is pinned so
+    # onupdate doesn't move a chat up the inbox just for being read
+    chats = Chat.__table__
+    for side, params in sides.items():
+        if not params:
+            continue
+        watermark = chats.c[f"{side}_last_read_id"]
+        db.session.execute(
+            update(chats)
+            .where(
+                chats.c.id == bindparam("b_chat_id"),
+                chats.c[f"{side}_id"] == reader_id,
+                watermark < bindparam("b_last_read_id")
+            )
+            .values({
+                watermark: bindparam("b_last_read_id"),
+                chats.c.read_updated_at: now,
+                chats.c.updated_at: chats.c.updated_at
+            }),
+            params
+        )
+
+    db.session.commit()
+
+    # only what this read covered: a message sent since is above the new
+    # watermark and must stay counted
+    subtract_unread(reader_id, {chat_id: count for chat_id, _, _, count in rows})
+
+    return rows
+
+
+def group_read_receipts(rows):
+    """{sender_id: [{chat_id, last_read_message_id}, ...]} for
+    messages_read_batch events."""
+    receipts = {}
+    for chat_id, sender_id, last_read_id, _ in rows:
+        receipts.setdefault(sender_id, []).append({
+            "chat_id": chat_id,
+            "last_read_message_id": last_read_id
+        })
+    return receipts
+
+
+def read_watermarks(chat_ids):
+    """{chat_id: {participant_id: last_read_id}} for rendering is_read."""
+    if not chat_ids:
+        return {}
+
+    rows = db.session.query(
+        Chat.id, Chat.creator_id, Chat.creator_last_read_id,
+        Chat.user_id, Chat.user_last_read_id
+    ).filter(Chat.id.in_(chat_ids)).all()
+
+    return {
+        chat_id: {creator_id: creator_read or 0, user_id: user_read or 0}
+        for chat_id, creator_id, creator_read, user_id, user_read in rows
+    }
+
+
+def is_read(watermarks, message):
+    """Whether the message's receiver has read it, per read_watermarks()."""
+    return message.id <= watermarks.get(message.chat_id, {}).get(message.receiver_id, 0)
@@ -0,0 +1,141 @@
+# app/services/search_service.py
+#
+# Full-text search over chat messages, backed by the message_terms inverted
+# index. Terms are written in the same transaction as the message (see
+# message_service), so search is consistent with send_message. Existing
+# rows are indexed with `flask rebuild-search-index`.
+#
+# Ranking: messages matching more of the query terms first, then newest.
+# Only the newest SEARCH_MAX_POSTINGS postings of each term are ranked, so
+# a common word costs a bounded scan however many messages contain it.
+
+import re
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, union_all
+from ..extensions import db
+from ..models import Chat, Message, MessageTerm
+
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "with"
+})
+
+
+def tokenize(text):
+    """Distinct, lower-cased index terms of a message or query, in order."""
+    terms = []
+    seen = set()
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        token = token[:MAX_TERM_LENGTH]
+        if token not in seen:
+            seen.add(token)
+            terms.append(token)
+    return terms
+
+
+def term_rows(message_id, chat_id, content):
+    return [
+        {"term": term, "chat_id": chat_id, "message_id": message_id}
+        for term in tokenize(content)
+    ]
+
+
+def index_messages(conn, messages):
+    """Insert index rows for [(message_id, chat_id, content), ...] on conn.
+
+    conn is either db.session or a Connection inside the caller's
+    transaction; nothing is committed here.
+    """
+    rows = []
+    for message_id, chat_id, content in messages:
+        rows.extend(term_rows(message_id, chat_id, content))
+    if rows:
+        conn.execute(insert(MessageTerm), rows)
+    return len(rows)
+
+
+def search_query(user_id, terms, max_postings):
+    """(Message, matched_terms) rows in the user's chats matching any of
+    terms, best match first."""
+    chat_ids = select(Chat.id).where(
+        (Chat.creator_id == user_id) | (Chat.user_id == user_id)
+    )
+
+    # one bounded, newest-first range per term on the (term, chat_id, ...) key
+    postings = union_all(*(
+        select(
+            select(MessageTerm.message_id)
+            .where(MessageTerm.term == term, MessageTerm.chat_id.in_(chat_ids))
+            .order_by(MessageTerm.message_id.desc())
+            .limit(max_postings)
+            .subquery()
+        )
+        for term in terms
+    )).subquery()
+
+    matched = func.count().label("matched")
+    hits = (
+        select(postings.c.message_id, matched)
+        .group_by(postings.c.message_id)
+        .subquery()
+    )
+
+    return (
+        db.session.query(Message, hits.c.matched)
+        .join(hits, hits.c.message_id == Message.id)
+        .order_by(hits.c.matched.desc(), Message.id.desc())
+    )
+
+
+def search_messages(user_id, query, limit, offset=0):
+    """Return (messages, has_more) for the caller's chats, best match first.
+
+    messages is a list of (Message, matched_terms).
+    """
+    terms = tokenize(query)[:MAX_QUERY_TERMS]
+    if not terms:
+        return [], False
+
+    rows = (
+        search_query(user_id, terms, current_app.config["SEARCH_MAX_POSTINGS"])
+        .offset(offset)
+        .limit(limit + 1)
+        .all()
+    )
+
+    return rows[:limit], len(rows) > limit
+
+
+def rebuild_index(batch_size=1000, log=print):
+    """Re-index every message from scratch; returns the message count."""
+    db.session.execute(delete(MessageTerm))
+    db.session.commit()
+
+    indexed = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.session.query(Message.id, Message.chat_id, Message.content)
+            .filter(Message.id > last_id)
+            .order_by(Message.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        index_messages(db.session, batch)
+        db.session.commit()
+
+        indexed += len(batch)
+        last_id = batch[-1].id
+        log(f"… indexed {indexed} messages")
+
+    return indexed
@@ -0,0 +1,118 @@
+# app/services/strategy_events.py
+#
+# Topic-scoped strategy broadcasts. Clients join rooms through the
+# subscribe_strategies socket event instead of receiving every change:
+#   strategies_public        public feed (status=1, published=1)
+#   strategies_owner_{id}    an owner's own dashboard
+#   strategy_{id}            one strategy's detail view
+#
+# Changes go through a coalescing broadcaster: updates to one strategy
+# within STRATEGY_BROADCAST_WINDOW_MS are merged into a single event,
+# sent once per socket even if it sits in several matching rooms.
+
+import threading
+from flask import current_app
+from ..extensions import socketio
+
+PUBLIC_ROOM = "strategies_public"
+
+UPDATED = "strategy_updated"
+DELETED = "strategy_deleted"
+
+
+def owner_room(owner_id):
+    return f"strategies_owner_{owner_id}"
+
+
+def strategy_room(strategy_id):
+    return f"strategy_{strategy_id}"
+
+
+def is_public(strategy):
+    return strategy.status == 1 and strategy.published == 1
+
+
+class CoalescingBroadcaster:
+    """Merge bursts of per-strategy events and emit them after a window.
+
+    The first event for a strategy schedules a flush ``window`` seconds
+    later; events arriving meanwhile update the pending payload and
+    widen its rooms. A delete replaces anything pending for the strategy.
+    """
+
+    def __init__(self, window=0.1):
+        self.window = window
+        self.flushes = 0
+        self.emitted = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._scheduled = False
+
+    def publish(self, event, strategy_id, payload, rooms):
+        if self.window <= 0:
+            self._emit(event, payload, rooms)
+            return
+
+        with self._lock:
+            pending = self._pending.get(strategy_id)
+            if pending is None:
+                self._pending[strategy_id] = [event, dict(payload), set(rooms)]
+            else:
+                self.coalesced += 1
+                if event == DELETED:
+                    pending[0], pending[1] = event, dict(payload)
+                elif pending[0] != DELETED:
+                    pending[1].update(payload)
+                pending[2].update(rooms)
+
+            if self._scheduled:
+                return
+            self._scheduled = True
+
+        socketio.start_background_task(self._flush_later)
+
+    def _flush_later(self):
+        socketio.sleep(self.window)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._scheduled = False
+            self.flushes += 1
+
+        for event, payload, rooms in batch.values():
+            self._emit(event, payload, rooms)
+
+    def _emit(self, event, payload, rooms):
+        # a list of rooms reaches each socket once
+        socketio.emit(event, payload, to=sorted(rooms))
+        self.emitted += 1
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            _broadcaster = CoalescingBroadcaster(
+                window=current_app.config["STRATEGY_BROADCAST_WINDOW_MS"] / 1000.0
+            )
+        return _broadcaster
+
+
+def publish_strategy_event(event, strategy, payload, was_public=False):
+    """Send a strategy change to the rooms interested in it.
+
+    The public feed hears about it if the strategy is public now or was
+    public before the change (so viewers can drop an unpublished one).
+    """
+    rooms = {strategy_room(strategy.id), owner_room(strategy.owner_id)}
+    if was_public or (event != DELETED and is_public(strategy)):
+        rooms.add(PUBLIC_ROOM)
+
+    get_broadcaster().publish(event, strategy.id, {"id": strategy.id, **payload}, rooms)
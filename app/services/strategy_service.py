@@ -0,0 +1,180 @@
+# app/services/strategy_service.py
+#
+# The dashboard addresses an owner's strategies by serial number (1-based
+# position in id order, see GET /strategy/private). Resolving a serial
+# used to mean loading the owner's whole portfolio; instead we cache the
+# ordered id list in Redis (strategy_ids:{owner_id}) and LINDEX into it.
+#
+# Every invalidation bumps strategy_ids_version:{owner_id}. A fill stores
+# its list only if the version is still the one it saw before reading the
+# DB, so a list read just before a create/delete never overwrites the
+# invalidation, and a cached list can be trusted as is. Only an id that
+# no longer loads (deleted, or the invalidation itself failed) sends the
+# lookup back to the DB.
+
+import redis
+from ..extensions import db, redis_client
+from ..models import Strategy
+
+STRATEGY_IDS_TTL = 300
+# outlives any fill in progress; an expired version just reads as None
+STRATEGY_IDS_VERSION_TTL = 86400
+
+
+def strategy_ids_key(owner_id: int) -> str:
+    return f"strategy_ids:{owner_id}"
+
+
+def strategy_ids_version_key(owner_id: int) -> str:
+    return f"strategy_ids_version:{owner_id}"
+
+
+def invalidate_strategy_ids(owner_id: int) -> None:
+    """Call after creating or deleting one of the owner's strategies."""
+    try:
+        pipe = redis_client.pipeline()
+        pipe.incr(strategy_ids_version_key(owner_id))
+        pipe.expire(strategy_ids_version_key(owner_id), STRATEGY_IDS_VERSION_TTL)
+        pipe.delete(strategy_ids_key(owner_id))
+        pipe.execute()
+    except redis.RedisError as e:
+        print("❌ Error invalidating strategy ids:", e)
+
+
+def _store_strategy_ids(owner_id: int, ids: list, version) -> bool:
+    """Cache ids unless the list was invalidated since version was read."""
+    key = strategy_ids_key(owner_id)
+    version_key = strategy_ids_version_key(owner_id)
+    with redis_client.pipeline() as pipe:
+        try:
+            pipe.watch(version_key)
+            if pipe.get(version_key) != version:
+                return False
+            pipe.multi()
+            pipe.delete(key)
+            pipe.rpush(key, *ids)
+            pipe.expire(key, STRATEGY_IDS_TTL)
+            pipe.execute()
+            return True
+        except redis.WatchError:
+            return False
+
+
+def strategy_ids_query(owner_id: int):
+    """The owner's strategy ids in serial order; ix_strategy_owner_id_id."""
+    return (
+        db.session.query(Strategy.id)
+        .filter(Strategy.owner_id == owner_id)
+        .order_by(Strategy.id.asc())
+    )
+
+
+def _load_strategy_ids(owner_id: int) -> list:
+    version = redis_client.get(strategy_ids_version_key(owner_id))
+    ids = [strategy_id for (strategy_id,) in strategy_ids_query(owner_id).all()]
+
+    if ids:
+        _store_strategy_ids(owner_id, ids, version)
+
+    return ids
+
+
+def _serial_from_db(owner_id: int, serial: int):
+    return strategy_ids_query(owner_id).offset(serial - 1).limit(1).scalar()
+
+
+def resolve_serial(owner_id: int, serial: int, refresh: bool = False):
+    """Map an owner's serial number to the real strategy id (or None)."""
+    if serial < 1:
+        return None
+
+    try:
+        if not refresh:
+            strategy_id = redis_client.lindex(strategy_ids_key(owner_id), serial - 1)
+            if strategy_id is not None:
+                return int(strategy_id)
+
+        # missing, expired or too short: rebuild from the id column only
+        ids = _load_strategy_ids(owner_id)
+    except redis.RedisError as e:
+        print("❌ Error reading strategy ids, using DB:", e)
+        return _serial_from_db(owner_id, serial)
+
+    return ids[serial - 1] if serial <= len(ids) else None
+
+
+def get_strategy_by_serial(owner_id: int, serial: int):
+    for refresh in (False, True):
+        strategy_id = resolve_serial(owner_id, serial, refresh=refresh)
+        if strategy_id is None:
+            return None
+
+        strategy = Strategy.query.filter_by(id=strategy_id, owner_id=owner_id).first()
+        if strategy is not None:
+            return strategy
+        # cached id is gone; retry once against fresh ids
+
+    return None
+
+
+def public_strategies_query():
+    """Published, active strategies; ix_strategy_status_published."""
+    return Strategy.query.filter(Strategy.status == 1, Strategy.published == 1)
+
+
+# -------------------------------------------------
+# GET /strategy/public RESPONSE CACHE
+# -------------------------------------------------
+# Each page is stored as a hash {etag, body} under the current cache
+# generation. Invalidation bumps the generation, so it is one INCR, and a
+# fill that read the old generation before querying lands in a key that
+# is no longer read; old generations simply expire.
+PUBLIC_CACHE_PREFIX = "public_strategies"
+PUBLIC_CACHE_GENERATION = f"{PUBLIC_CACHE_PREFIX}:generation"
+PUBLIC_CACHE_TTL = 300
+
+
+
+def public_cache_key(generation: str, page: int, per_page: int) -> str:
+    return f"{PUBLIC_CACHE_PREFIX}:{generation}:{page}:{per_page}"
+
+
+def public_cache_generation():
+    """The generation to read and fill under, or None without Redis."""
+    try:
+        return redis_client.get(PUBLIC_CACHE_GENERATION) or "0"
+    except redis.RedisError as e:
+        print("❌ Error reading public strategy cache:", e)
+        return None
+
+
+def get_cached_public_page(generation: str, page: int, per_page: int):
+    """Return (etag, body) or None."""
+    try:
+        cached = redis_client.hgetall(public_cache_key(generation, page, per_page))
+    except redis.RedisError as e:
+        print("❌ Error reading public strategy cache:", e)
+        return None
+
+    if "etag" not in cached or "body" not in cached:
+        return None
+    return cached["etag"], cached["body"]
+
+
+def set_cached_public_page(generation: str, page: int, per_page: int, etag: str, body: str) -> None:
+    key = public_cache_key(generation, page, per_page)
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(key, mapping={"etag": etag, "body": body})
+        pipe.expire(key, PUBLIC_CACHE_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        print("❌ Error writing public strategy cache:", e)
+
+
+def invalidate_public_strategies() -> None:
+    """Call wherever a strategy_updated / strategy_deleted event is sent."""
+    try:
+        redis_client.incr(PUBLIC_CACHE_GENERATION)
+    except redis.RedisError as e:
+        print("❌ Error invalidating public strategy cache:", e)
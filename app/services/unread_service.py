@@ -0,0 +1,157 @@
+# app/services/unread_service.py
+#
+# Per-user unread counters kept in a Redis hash:
+#   unread:{user_id} -> {chat_id: count, "_built": 1, "_version": n}
+# The "_built" marker tells a rebuilt hash apart from one that was lost
+# (an empty hash does not exist in Redis), so lookups rebuild from the DB
+# whenever the marker is missing.
+#
+# Every increment and subtraction also bumps "_version". A rebuild notes the
+# version before counting in the DB and swaps its counts in only if no
+# update landed meanwhile; otherwise the hash stays unbuilt and the next
+# lookup rebuilds again, so a racing HINCRBY is never wiped out.
+
+import redis
+from sqlalchemy import case, func
+from ..extensions import db, redis_client
+from ..models import Chat, Message
+
+BUILT_FIELD = "_built"
+VERSION_FIELD = "_version"
+
+# KEYS: hash   ARGV: version seen before counting ("" if none), then
+# chat_id, count pairs. Returns 1 if swapped in, 0 if the hash changed.
+REBUILD_SCRIPT = """
+local version = redis.call('HGET', KEYS[1], '_version') or ''
+if version ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], '_built', 1)
+if version ~= '' then
+    redis.call('HSET', KEYS[1], '_version', version)
+end
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+# KEYS: hash   ARGV: chat_id, count pairs. Takes each count off its chat,
+# dropping chats that reach zero; a message counted meanwhile stays counted.
+SUBTRACT_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    if redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1])) <= 0 then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+redis.call('HINCRBY', KEYS[1], '_version', 1)
+"""
+
+# Registered on first use, so importing this module doesn't build the client
+_scripts = {}
+
+
+def _script(source):
+    if source not in _scripts:
+        _scripts[source] = redis_client.register_script(source)
+    return _scripts[source]
+
+
+def unread_key(user_id: int) -> str:
+    return f"unread:{user_id}"
+
+
+def _forget_built(user_id: int) -> None:
+    """After a failed update the counts can't be trusted: make the next
+    lookup rebuild from the DB."""
+    try:
+        redis_client.hdel(unread_key(user_id), BUILT_FIELD)
+    except redis.RedisError as e:
+        print("❌ Error invalidating unread counters:", e)
+
+
+def increment_unread(user_id: int, chat_id: int, amount: int = 1) -> None:
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hincrby(unread_key(user_id), chat_id, amount)
+        pipe.hincrby(unread_key(user_id), VERSION_FIELD, 1)
+        pipe.execute()
+    except redis.RedisError as e:
+        print("❌ Error updating unread counter:", e)
+        _forget_built(user_id)
+
+
+def subtract_unread(user_id: int, counts: dict) -> None:
+    """Take {chat_id: count} read messages off the counters. Subtracting
+    what was read, rather than dropping the chat, keeps messages that
+    arrived after the read in the count."""
+    if not counts:
+        return
+    args = []
+    for chat_id, count in counts.items():
+        args += [chat_id, count]
+    try:
+        _script(SUBTRACT_SCRIPT)(keys=[unread_key(user_id)], args=args)
+    except redis.RedisError as e:
+        print("❌ Error updating unread counters:", e)
+        _forget_built(user_id)
+
+
+def reader_watermark(reader_id: int):
+    """SQL expression for the reader's read watermark on a joined Chat row."""
+    return case(
+        (Chat.creator_id == reader_id, Chat.creator_last_read_id),
+        else_=Chat.user_last_read_id
+    )
+
+
+def unread_counts_query(user_id: int):
+    """Messages to the user above their watermark, per chat; a range seek
+    on ix_message_chat_receiver_id for each of the user's chats."""
+    return (
+        db.session.query(Message.chat_id, func.count(Message.id))
+        .join(Chat, Chat.id == Message.chat_id)
+        .filter(
+            (Chat.creator_id == user_id) | (Chat.user_id == user_id),
+            Message.receiver_id == user_id,
+            Message.id > reader_watermark(user_id)
+        )
+        .group_by(Message.chat_id)
+    )
+
+
+def count_unread_from_db(user_id: int) -> dict:
+    return {chat_id: count for chat_id, count in unread_counts_query(user_id).all()}
+
+
+def rebuild_unread_counts(user_id: int, version=None) -> dict:
+    """Recount from the DB; version is the hash's "_version" as last
+    read, if the caller already has it."""
+    if version is None:
+        version = redis_client.hget(unread_key(user_id), VERSION_FIELD) or ""
+    counts = count_unread_from_db(user_id)
+
+    args = [version]
+    for chat_id, count in counts.items():
+        args += [chat_id, count]
+    _script(REBUILD_SCRIPT)(keys=[unread_key(user_id)], args=args)
+
+    return counts
+
+
+def get_unread_counts(user_id: int) -> dict:
+    """Return {chat_id: unread_count} for chats with unread messages."""
+    try:
+        raw = redis_client.hgetall(unread_key(user_id))
+        if BUILT_FIELD not in raw:
+            return rebuild_unread_counts(user_id, raw.get(VERSION_FIELD, ""))
+    except redis.RedisError as e:
+        print("❌ Error reading unread counters, using DB:", e)
+        return count_unread_from_db(user_id)
+
+    return {
+        int(chat_id): int(count)
+        for chat_id, count in raw.items()
+        if chat_id not in (BUILT_FIELD, VERSION_FIELD) and int(count) > 0
+    }
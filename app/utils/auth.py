@@ -1,12 +1,62 @@
 
 from functools import wraps
-from flask import request, jsonify, current_app
+from flask import g, request, jsonify, current_app
 import jwt
+from sqlalchemy import event
+from app.config import Config
+from app.extensions import db
 from app.models import User
+from app.utils.auth_cache import AuthCache, UserSnapshot
+
+# Shared by token_required and the socket connect handler
+auth_cache = AuthCache(
+    maxsize=Config.AUTH_CACHE_SIZE,
+    ttl=Config.AUTH_CACHE_TTL
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    auth_cache.invalidate_user(target.id)
+
+
+def authenticate_token(token):
+    """Return a UserSnapshot for a valid token, or None if the user is gone.
+
+    Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError like jwt.decode.
+    """
+    snapshot = auth_cache.get(token)
+    if snapshot is not None:
+        return snapshot
+
+    payload = jwt.decode(
+        token,
+        current_app.config["SECRET_KEY"],
+        algorithms=["HS256"]
+    )
+
+    row = (
+        db.session.query(User.id, User.name, User.email, User.is_verified)
+        .filter(User.id == payload.get("user_id"))
+        .first()
+    )
+    if not row:
+        return None
+
+    snapshot = UserSnapshot(*row)
+    auth_cache.set(token, snapshot, token_exp=payload.get("exp"))
+    return snapshot
+
 
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
+        # sub-request of POST /batch: the batch already authenticated
+        batch_user = g.get("batch_user")
+        if batch_user is not None:
+            return f(batch_user, *args, **kwargs)
+
         token = None
 
         auth_header = request.headers.get("Authorization")
@@ -24,13 +74,7 @@ def token_required(f):
             }), 401
 
         try:
-            payload = jwt.decode(
-                token,
-                current_app.config["SECRET_KEY"],
-                algorithms=["HS256"]
-            )
-
-            current_user = User.query.get(payload.get("user_id"))
+            current_user = authenticate_token(token)
             if not current_user:
                 return jsonify({
                     "success": False,
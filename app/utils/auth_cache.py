@@ -0,0 +1,79 @@
+# app/utils/auth_cache.py
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# What authenticated handlers get instead of a full User row
+UserSnapshot = namedtuple("UserSnapshot", ["id", "name", "email", "is_verified"])
+
+
+class AuthCache:
+    """Bounded LRU of verified JWTs -> UserSnapshot, with a TTL per entry.
+
+    Entries never outlive the token's own ``exp`` claim, so a cache hit
+    skips both the JWT decode and the User lookup.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # token -> (snapshot, expires_at)
+        self._tokens_by_user = {}       # user_id -> {token, ...}
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    self._discard(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, token, snapshot, token_exp=None):
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+
+        with self._lock:
+            self._discard(token)
+            self._entries[token] = (snapshot, expires_at)
+            self._tokens_by_user.setdefault(snapshot.id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._discard(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _discard(self, token):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[0].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[0].id]
@@ -0,0 +1,74 @@
+# app/utils/json_provider.py
+#
+# orjson-backed JSON for HTTP responses (jsonify, the success/error helpers,
+# app.json.dumps) and for Socket.IO packets. orjson is optional: without it
+# Flask's stdlib provider and the default Socket.IO encoder stay in place.
+
+import decimal
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(o):
+    """Types orjson doesn't encode natively (datetime, date, UUID and
+    dataclasses it does)."""
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    mimetype = "application/json"
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # skip the bytes -> str -> bytes round trip of the base class
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
+class OrjsonSocketJSON:
+    """json-module stand-in for python-socketio's default serializer."""
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return orjson.dumps(obj, default=_default, option=OrjsonProvider.option).decode("utf-8")
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
+
+
+def configure_json(app):
+    """Install the orjson provider when JSON_BACKEND=orjson and it's available."""
+    if app.config["JSON_BACKEND"] == "orjson" and orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+def socketio_serializer_options(config):
+    """Keyword arguments for socketio.init_app.
+
+    SOCKETIO_SERIALIZER=msgpack sends binary packets (needs the msgpack
+    package, and clients using socket.io-msgpack-parser); otherwise packets
+    stay JSON, encoded with orjson when available.
+    """
+    if config["SOCKETIO_SERIALIZER"] == "msgpack":
+        return {"serializer": "msgpack"}
+    if config["JSON_BACKEND"] == "orjson" and orjson is not None:
+        return {"json": OrjsonSocketJSON}
+    return {}
@@ -0,0 +1,95 @@
+# app/utils/query_plans.py
+#
+# EXPLAIN-based check that each route's main query is served by an index.
+# Run with `flask check-indexes`; it exits non-zero on a full table scan.
+# The statements come from the same query functions the routes and
+# services execute, so the check cannot drift from what actually runs.
+# MySQL's planner is cost based, so run it against realistically sized
+# data (see benchmarks/seed.py) rather than an empty schema.
+
+import re
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import text
+from app.extensions import db
+
+SAMPLE_ID = 1
+SAMPLE_SINCE = datetime(2024, 1, 1)
+SAMPLE_CURSOR = namedtuple("SampleCursor", "created_at id")(SAMPLE_SINCE, SAMPLE_ID)
+
+SUPPORTED_DIALECTS = ("sqlite", "mysql", "mariadb")
+
+
+def hot_queries():
+    """(route, query) pairs, built by the routes' own query functions."""
+    # imported here: routes pull in the whole app
+    from app.routes.chat_routes import _inbox_query, _message_window_query
+    from app.services.read_service import unread_by_chat_query
+    from app.services.search_service import search_query
+    from app.services.strategy_service import public_strategies_query, strategy_ids_query
+    from app.services.sync_service import new_messages_query, read_changes_query
+    from app.services.unread_service import unread_counts_query
+
+    limit = 51
+    return [
+        ("GET /chat/<id>/messages", _message_window_query(SAMPLE_ID).limit(limit)),
+        ("GET /chat/<id>/messages?before_id=",
+         _message_window_query(SAMPLE_ID, SAMPLE_CURSOR).limit(limit)),
+        ("GET /chat/<id>/messages?after_id=",
+         _message_window_query(SAMPLE_ID, SAMPLE_CURSOR, after=True).limit(limit)),
+        ("GET /chat/list, /chat/all-unread-counts (unread rebuild)", unread_counts_query(SAMPLE_ID)),
+        ("GET /chat/list", _inbox_query(SAMPLE_ID)),
+        ("PUT /chat/<id>/read, PUT /chat/read", unread_by_chat_query(SAMPLE_ID, [SAMPLE_ID])),
+        ("GET /chat/search", search_query(SAMPLE_ID, ["sample"], 5000).limit(21)),
+        ("GET /chat/sync (messages)", new_messages_query(SAMPLE_ID, SAMPLE_SINCE, SAMPLE_ID)),
+        ("GET /chat/sync (reads)", read_changes_query(SAMPLE_ID, SAMPLE_SINCE)),
+        ("GET /strategy/public", public_strategies_query().limit(10)),
+        ("GET /strategy/private, serial resolution", strategy_ids_query(SAMPLE_ID)),
+    ]
+
+
+def explain(query):
+    """Return (uses_index, plan_lines) for one ORM query or statement;
+    uses_index is None when the dialect has no EXPLAIN check."""
+    dialect = db.engine.dialect
+    if dialect.name not in SUPPORTED_DIALECTS:
+        return None, [f"no EXPLAIN check for dialect {dialect.name!r}, skipped"]
+
+    statement = getattr(query, "statement", query)
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+    with db.engine.connect() as conn:
+        if dialect.name == "sqlite":
+            rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql)).all()
+            lines = [row[-1] for row in rows]
+            # scanning a subquery's (already bounded) result is fine
+            derived = {
+                match.group(1) for match in
+                (re.fullmatch(r"(?:CO-ROUTINE|MATERIALIZE) (\w+)", line) for line in lines)
+                if match
+            }
+            full_scan = any(
+                match and match.group(1) not in derived
+                for match in (re.fullmatch(r"SCAN (\w+)", line) for line in lines)
+            )
+            uses_index = any("INDEX" in line or "PRIMARY KEY" in line for line in lines)
+            return uses_index and not full_scan, lines
+
+        result = conn.execute(text("EXPLAIN " + sql))
+        rows = [dict(zip(result.keys(), row)) for row in result]
+        lines = [
+            f"{r['table']}: type={r['type']} key={r['key']} rows={r['rows']}"
+            for r in rows
+        ]
+        # <derivedN> / <unionN,M> rows read a subquery's result, not a table
+        uses_index = all(
+            r["table"] is None or r["table"].startswith("<")
+            or (r["type"] != "ALL" and r["key"] is not None)
+            for r in rows
+        )
+        return uses_index, lines
+
+
+def check_hot_queries():
+    """[(route, uses_index, plan_lines), ...] for every hot query."""
+    return [(route, *explain(query)) for route, query in hot_queries()]
@@ -0,0 +1,194 @@
+# app/utils/rate_limit.py
+#
+# Sliding-window rate limiting for the auth and chat hot paths.
+#
+#   @rate_limit("login", "ip", "email")
+#
+# checks one window per scope, with limits from Config.RATE_LIMITS
+# ("login:ip" -> "30/300" = 30 hits per 300 seconds). Scopes:
+#   ip      request.remote_addr (the client's once TRUSTED_PROXY_HOPS is set
+#           behind a proxy; callers without one share a single window)
+#   email   "email" in the JSON body (skipped if absent)
+#   user    current_user passed in by token_required (stack it below)
+#
+# Each window is a Redis sorted set of hit timestamps. One atomic script
+# trims and counts every scope's window and records the hit only if all
+# of them have room, so a denied request uses up none of its budgets. If
+# Redis is unavailable, in-process windows take over, so limits still
+# hold per worker.
+
+import itertools
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from functools import wraps
+import redis
+from flask import current_app, jsonify, request
+from app.extensions import redis_client
+
+# KEYS: windows   ARGV: now ms, member, then window ms, limit per key
+# Returns {allowed, retry_after_ms}
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local retry = 0
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[2 * i + 1])
+    local limit = tonumber(ARGV[2 * i + 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry = math.max(retry, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry > 0 then
+    return {0, retry}
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, tonumber(ARGV[2 * i + 1]))
+end
+return {1, 0}
+"""
+
+_script = None
+# unique sorted-set members for hits landing in the same millisecond,
+# across threads, workers and hosts
+_member_ids = itertools.count()
+_member_prefix = uuid.uuid4().hex[:12]
+
+
+def parse_limit(spec):
+    """"30/300" -> (30, 300.0)."""
+    count, seconds = spec.split("/")
+    return int(count), float(seconds)
+
+
+def window_key(rule, scope, identity):
+    return f"ratelimit:{rule}:{scope}:{identity}"
+
+
+class LocalWindows:
+    """In-process sliding windows, used while Redis is unreachable."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._windows = OrderedDict()
+
+    def hit(self, windows):
+        """Same contract as the Redis script: windows is
+        [(key, limit, window_seconds), ...]."""
+        now = time.monotonic()
+        with self._lock:
+            retry_after = 0.0
+            trimmed = []
+            for key, limit, window in windows:
+                hits = self._windows.pop(key, None) or deque()
+                while hits and hits[0] <= now - window:
+                    hits.popleft()
+                if len(hits) >= limit:
+                    retry_after = max(retry_after, hits[0] + window - now)
+                trimmed.append((key, hits))
+
+            allowed = not retry_after
+            for key, hits in trimmed:
+                if allowed:
+                    hits.append(now)
+                # most recently used last; evict from the front
+                self._windows[key] = hits
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+
+            return allowed, retry_after
+
+
+local_windows = LocalWindows()
+
+
+def hit(windows):
+    """Record one hit in every (key, limit, window_seconds) window, or in
+    none if any of them is full; returns (allowed, retry_after_seconds)."""
+    global _script
+    try:
+        if _script is None:
+            _script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        args = [int(time.time() * 1000), f"{_member_prefix}-{next(_member_ids)}"]
+        for _, limit, window in windows:
+            args += [int(window * 1000), limit]
+        allowed, retry_ms = _script(keys=[key for key, _, _ in windows], args=args)
+        return bool(allowed), int(retry_ms) / 1000.0
+    except redis.RedisError as e:
+        print("❌ Rate limiter falling back to in-process windows:", e)
+        return local_windows.hit(windows)
+
+
+def check_rate_limits(rule, identities):
+    """Check a rule for {scope: identity}; returns (allowed, retry_after).
+
+    Scopes without a configured limit or with a None identity are skipped.
+    """
+    config = current_app.config
+    if not config["RATE_LIMIT_ENABLED"]:
+        return True, 0.0
+
+    windows = []
+    for scope, identity in identities.items():
+        spec = config["RATE_LIMITS"].get(f"{rule}:{scope}")
+        if spec and identity is not None:
+            limit, window = parse_limit(spec)
+            windows.append((window_key(rule, scope, identity), limit, window))
+
+    if not windows:
+        return True, 0.0
+    return hit(windows)
+
+
+def check_rate_limit(rule, scope, identity):
+    """Check one rule/scope for an identity; returns (allowed, retry_after).
+
+    Also usable outside HTTP routes, e.g. from socket handlers.
+    """
+    return check_rate_limits(rule, {scope: identity})
+
+
+def _identity(scope, args):
+    if scope == "ip":
+        # no address (e.g. a unix socket behind a proxy) must not mean no limit
+        return request.remote_addr or "unknown"
+    if scope == "email":
+        email = (request.get_json(silent=True) or {}).get("email")
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+    if scope == "user":
+        return args[0].id if args else None
+    raise ValueError(f"Unknown rate limit scope {scope!r}")
+
+
+def too_many_requests(retry_after):
+    seconds = max(1, math.ceil(retry_after))
+    response = jsonify({
+        "status": "error",
+        "message": "Too many requests. Please try again later.",
+        "retry_after": seconds
+    })
+    response.status_code = 429
+    response.headers["Retry-After"] = str(seconds)
+    return response
+
+
+def rate_limit(rule, *scopes):
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            allowed, retry_after = check_rate_limits(
+                rule, {scope: _identity(scope, args) for scope in scopes}
+            )
+            if not allowed:
+                return too_many_requests(retry_after)
+
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
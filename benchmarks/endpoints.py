@@ -0,0 +1,215 @@
+"""Endpoint latency benchmark across growing data sizes.
+
+For each scale factor the schema is recreated, seeded (benchmarks/seed.py)
+with base counts x scale, and every endpoint is called through the Flask
+test client. Reports p50/p95/p99 latency and throughput as JSON, so runs
+from different releases can be diffed.
+
+Needs a local Redis. Uses a temporary SQLite file unless DATABASE_URI is
+set (tables in that database are DROPPED, so it must be named *bench*
+unless --i-know is given):
+
+    python benchmarks/endpoints.py --scales 1,4,16 --requests 200 \\
+        --output bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "endpoints.db"
+    )
+# measure the endpoints, not the per-user send budget
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+from sqlalchemy import func  # noqa: E402
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import Chat, Message, Strategy  # noqa: E402
+from seed import PASSWORD, make_token, require_disposable, seed  # noqa: E402
+
+
+def pick_targets(app):
+    """The heaviest user and chat: latency should stay flat even for them."""
+    with app.app_context():
+        user_id, _ = (
+            db.session.query(Chat.creator_id, func.count(Chat.id))
+            .group_by(Chat.creator_id)
+            .order_by(func.count(Chat.id).desc())
+            .first()
+        )
+        chat_id, _ = (
+            db.session.query(Message.chat_id, func.count(Message.id))
+            .group_by(Message.chat_id)
+            .order_by(func.count(Message.id).desc())
+            .first()
+        )
+        chat = db.session.get(Chat, chat_id)
+        owner_id, _ = (
+            db.session.query(Strategy.owner_id, func.count(Strategy.id))
+            .group_by(Strategy.owner_id)
+            .order_by(func.count(Strategy.id).desc())
+            .first()
+        )
+    return {"user_id": user_id, "chat_id": chat_id, "chat_user_id": chat.user_id,
+            "owner_id": owner_id}
+
+
+def endpoints(app, targets):
+    def auth(user_id):
+        return {"Authorization": f"Bearer {make_token(app, user_id)}"}
+
+    return {
+        "GET /chat/list": ("get", "/chat/list", {"headers": auth(targets["user_id"])}),
+        "GET /chat/<id>/messages": (
+            "get", f"/chat/{targets['chat_id']}/messages",
+            {"headers": auth(targets["chat_user_id"])}
+        ),
+        "GET /chat/all-unread-counts": (
+            "get", "/chat/all-unread-counts", {"headers": auth(targets["user_id"])}
+        ),
+        "GET /strategy/public": ("get", "/strategy/public", {}),
+        "GET /strategy/private": (
+            "get", "/strategy/private", {"headers": auth(targets["owner_id"])}
+        ),
+        "POST /auth/login": (
+            "post", "/auth/login",
+            {"json": {"email": f"user{targets['user_id']}@bench.example.com",
+                      "password": PASSWORD}}
+        ),
+    }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(app, method, path, kwargs, requests, warmup, concurrency):
+    client = app.test_client()
+    for _ in range(warmup):
+        getattr(client, method)(path, **kwargs)
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    per_worker = max(1, requests // concurrency)
+
+    def worker():
+        worker_client = app.test_client()
+        for _ in range(per_worker):
+            started = time.perf_counter()
+            response = getattr(worker_client, method)(path, **kwargs)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "requests_per_second": round(len(latencies) / wall, 1)
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,4,16",
+                        help="comma separated multipliers of the base counts")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--strategies", type=int, default=150)
+    parser.add_argument("--chats", type=int, default=250)
+    parser.add_argument("--messages", default="pareto:1.5:20",
+                        help="per-chat message count distribution (see seed.py)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--i-know", action="store_true",
+                        help="allow a DATABASE_URI that is not SQLite or named *bench*")
+    args = parser.parse_args()
+
+    require_disposable(os.environ["DATABASE_URI"], args.i_know)
+    app = create_app()
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "started_at": datetime.datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "database": None,
+            "params": vars(args)
+        },
+        "results": []
+    }
+
+    for scale in (int(s) for s in args.scales.split(",")):
+        with app.app_context():
+            report["meta"]["database"] = db.engine.dialect.name
+            db.drop_all()
+            db.create_all()
+            sizes = seed(
+                args.users * scale,
+                args.strategies * scale,
+                args.chats * scale,
+                args.messages,
+                args.seed
+            )
+
+        targets = pick_targets(app)
+        results = {
+            name: measure(app, method, path, kwargs,
+                          args.requests, args.warmup, args.concurrency)
+            for name, (method, path, kwargs) in endpoints(app, targets).items()
+        }
+        report["results"].append({"scale": scale, "data": sizes, "endpoints": results})
+        print(f"✅ scale {scale}: {sizes}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Round trips and latency per OTP operation: legacy calls vs Lua scripts.
+
+Verification is measured as /auth/verify_otp runs it: a failed check
+also counts the attempt.
+
+Needs a local Redis (REDIS_HOST / REDIS_PORT, default localhost:6379):
+
+    python benchmarks/otp_roundtrips.py --iterations 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import redis
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CountingConnection(redis.Connection):
+    round_trips = 0
+
+    def send_packed_command(self, command, check_health=True):
+        CountingConnection.round_trips += 1
+        return super().send_packed_command(command, check_health)
+
+
+# -------------------------------------------------
+# LEGACY IMPLEMENTATION (one command per call)
+# -------------------------------------------------
+def legacy_generate(r, email, expiry=180):
+    otp = str(random.randint(100000, 999999))
+    r.setex(f"otp:{email}", expiry, otp)
+    r.setex(f"otp_resend_lock:{email}", 30, "1")
+    r.setex(f"otp_attempts:{email}", expiry, 0)
+    return otp
+
+
+def legacy_verify(r, email, otp):
+    stored = r.get(f"otp:{email}")
+    if not stored:
+        return False
+    if stored == otp:
+        r.delete(f"otp:{email}")
+        r.delete(f"otp_attempts:{email}")
+        return True
+    return False
+
+
+def legacy_attempt(r, email):
+    attempts = r.incr(f"otp_attempts:{email}")
+    if attempts > 3:
+        r.delete(f"otp:{email}")
+        r.delete(f"otp_attempts:{email}")
+        return False
+    return True
+
+
+def measure(name, fn, iterations):
+    CountingConnection.round_trips = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    elapsed = time.perf_counter() - started
+    return {
+        "operation": name,
+        "iterations": iterations,
+        "round_trips_per_op": CountingConnection.round_trips / iterations,
+        "mean_us": elapsed / iterations * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    pool = redis.ConnectionPool(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        db=int(os.getenv("REDIS_DB", 0)),
+        decode_responses=True,
+        connection_class=CountingConnection
+    )
+    r = redis.StrictRedis(connection_pool=pool)
+
+    # register the service's scripts on the counting client and preload
+    # them so EVALSHA hits
+    from app.services import otp_service
+    for source in (otp_service.GENERATE_SCRIPT, otp_service.VERIFY_SCRIPT):
+        otp_service._scripts[source] = r.register_script(source)
+        r.script_load(source)
+
+    n = args.iterations
+    email = "bench-{}@example.com".format
+    results = [
+        measure("legacy.generate", lambda i: legacy_generate(r, email(i)), n),
+        measure("lua.generate", lambda i: otp_service.generate_and_store_otp(email(i)), n),
+        measure("legacy.verify+attempt",
+                lambda i: legacy_verify(r, email(i), "000000") or legacy_attempt(r, email(i)), n),
+        measure("lua.verify+attempt",
+                lambda i: otp_service.verify_otp(email(i), "000000", count_attempt=True), n),
+    ]
+
+    r.delete(*[key for i in range(n) for key in (
+        f"otp:{email(i)}", f"otp_resend_lock:{email(i)}", f"otp_attempts:{email(i)}"
+    )])
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
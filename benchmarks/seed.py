@@ -0,0 +1,217 @@
+"""Synthetic data generator for the benchmarks.
+
+Creates N users, M strategies and K chats, with a per-chat message count
+drawn from a configurable distribution:
+
+    fixed:50          every chat gets 50 messages
+    uniform:0:200     uniform between 0 and 200
+    pareto:1.5:20     long tail (shape 1.5, minimum 20), a few huge chats
+
+Standalone use seeds the database configured by DATABASE_URI:
+
+    python benchmarks/seed.py --users 1000 --strategies 5000 --chats 20000 \\
+        --messages pareto:1.5:20
+
+Seeding deletes cached Redis keys (and --reset drops every table), so it
+only runs against SQLite or a database whose name contains "bench",
+unless --i-know is given.
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app.extensions import db, redis_client  # noqa: E402
+from app.models import Chat, Message, Strategy, User  # noqa: E402
+
+PASSWORD = "benchmark-password"
+BATCH = 5000
+
+
+def make_token(app, user_id):
+    return jwt.encode(
+        {
+            "user_id": user_id,
+            "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        },
+        app.config["SECRET_KEY"],
+        algorithm="HS256"
+    )
+
+
+def is_disposable(uri):
+    """SQLite, or a database whose name says it is for benchmarks."""
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" or "bench" in (url.database or "").lower()
+
+
+def require_disposable(uri, i_know=False):
+    """Exit unless uri is safe to wipe; --i-know overrides."""
+    if i_know or is_disposable(uri):
+        return
+    sys.exit(
+        f"❌ Refusing to wipe {make_url(uri).render_as_string(hide_password=True)}: "
+        "benchmarks drop tables and delete Redis keys. Use SQLite or a database "
+        "named *bench*, or pass --i-know."
+    )
+
+
+def parse_distribution(spec):
+    """Return a callable rng -> message count for a distribution spec."""
+    kind, *params = spec.split(":")
+    if kind == "fixed":
+        count = int(params[0])
+        return lambda rng: count
+    if kind == "uniform":
+        low, high = int(params[0]), int(params[1])
+        return lambda rng: rng.randint(low, high)
+    if kind == "pareto":
+        shape, minimum = float(params[0]), int(params[1])
+        return lambda rng: int(minimum * rng.paretovariate(shape))
+    raise ValueError(f"Unknown message distribution {spec!r}")
+
+
+def _insert(table, rows):
+    for start in range(0, len(rows), BATCH):
+        db.session.execute(insert(table), rows[start:start + BATCH])
+
+
+def reset_redis_state():
+    """Drop cached keys that would describe a previous dataset."""
+    patterns = ("unread:*", "strategy_ids:*", "public_strategies*")
+    for pattern in patterns:
+        keys = list(redis_client.scan_iter(match=pattern, count=1000))
+        if keys:
+            redis_client.delete(*keys)
+
+
+def seed(users, strategies, chats, messages="uniform:0:100", seed_value=42):
+    """Fill an empty schema; call inside an app context. Returns counts."""
+    if users < 2 or chats > strategies * (users - 1):
+        raise ValueError("Not enough users/strategies for that many distinct chats")
+
+    rng = random.Random(seed_value)
+    message_count = parse_distribution(messages)
+    password_hash = generate_password_hash(PASSWORD)
+    now = datetime.datetime.utcnow()
+
+    _insert(User.__table__, [{
+        "id": i,
+        "name": f"user{i}",
+        "email": f"user{i}@bench.example.com",
+        "password": password_hash,
+        "is_verified": True
+    } for i in range(1, users + 1)])
+
+    strategy_owner = {}
+    strategy_rows = []
+    for i in range(1, strategies + 1):
+        owner = rng.randint(1, users)
+        strategy_owner[i] = owner
+        strategy_rows.append({
+            "id": i,
+            "name": f"strategy{i}",
+            "description": "synthetic benchmark strategy",
+            "capital_required": rng.randint(1, 100) * 1000,
+            "status": rng.choice((0, 1, 1)),
+            "published": rng.choice((0, 1)),
+            "owner_id": owner
+        })
+    _insert(Strategy.__table__, strategy_rows)
+
+    seen = set()
+    chat_rows = []
+    message_rows = []
+    message_id = 0
+    for chat_id in range(1, chats + 1):
+        while True:
+            strategy_id = rng.randint(1, strategies)
+            creator_id = strategy_owner[strategy_id]
+            user_id = rng.randint(1, users)
+            key = (strategy_id, creator_id, user_id)
+            if user_id != creator_id and key not in seen:
+                seen.add(key)
+                break
+
+        started = now - datetime.timedelta(days=rng.randint(1, 365))
+        first_id = message_id + 1
+        count = message_count(rng)
+        last = None
+        for n in range(count):
+            message_id += 1
+            from_user = rng.random() < 0.5
+            last = {
+                "id": message_id,
+                "chat_id": chat_id,
+                "sender_id": user_id if from_user else creator_id,
+                "receiver_id": creator_id if from_user else user_id,
+                "content": f"synthetic message {n} in chat {chat_id}",
+                "created_at": started + datetime.timedelta(minutes=n)
+            }
+            message_rows.append(last)
+
+        chat_rows.append({
+            "id": chat_id,
+            "strategy_id": strategy_id,
+            "creator_id": creator_id,
+            "user_id": user_id,
+            "created_at": started,
+            "updated_at": last["created_at"] if last else started,
+            "last_message_id": last["id"] if last else None,
+            "last_message_sender_id": last["sender_id"] if last else None,
+            "last_message_preview": last["content"] if last else None,
+            # each side has read most of the chat, leaving a tail unread
+            "creator_last_read_id": first_id - 1 + int(count * rng.uniform(0.6, 1.0)),
+            "user_last_read_id": first_id - 1 + int(count * rng.uniform(0.6, 1.0))
+        })
+
+    _insert(Chat.__table__, chat_rows)
+    _insert(Message.__table__, message_rows)
+    db.session.commit()
+    reset_redis_state()
+
+    return {
+        "users": users,
+        "strategies": strategies,
+        "chats": chats,
+        "messages": len(message_rows)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--strategies", type=int, default=300)
+    parser.add_argument("--chats", type=int, default=1000)
+    parser.add_argument("--messages", default="uniform:0:100")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--i-know", action="store_true",
+                        help="allow a database that is not SQLite or named *bench*")
+    args = parser.parse_args()
+
+    from app import create_app
+    from app.config import Config
+    require_disposable(Config.SQLALCHEMY_DATABASE_URI, args.i_know)
+    app = create_app()
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        counts = seed(args.users, args.strategies, args.chats, args.messages, args.seed)
+        print(f"✅ Seeded {counts} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
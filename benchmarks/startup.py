@@ -0,0 +1,64 @@
+"""Cold-start time: `import app` + create_app() in a fresh interpreter.
+
+Each run is a new subprocess, so module import costs are paid every time.
+Prints JSON with the per-phase breakdown from app.config["STARTUP_TIMINGS"]
+and exits non-zero if the median exceeds --max-seconds, so it can gate CI:
+
+    python benchmarks/startup.py --runs 5 --max-seconds 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+done = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - started,
+    "create_app_s": done - imported,
+    "total_s": done - started,
+    "phases_ms": flask_app.config["STARTUP_TIMINGS"]
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    env = dict(os.environ, LOG_STARTUP_TIMINGS="0", AUTO_CREATE_TABLES="0")
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", PROBE], cwd=ROOT, env=env
+        )
+        runs.append(json.loads(output.decode().strip().splitlines()[-1]))
+
+    median = statistics.median(run["total_s"] for run in runs)
+    report = {
+        "runs": runs,
+        "median_total_s": round(median, 4),
+        "max_seconds": args.max_seconds,
+        "ok": median <= args.max_seconds
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+    if not report["ok"]:
+        sys.exit(f"❌ Median startup {median:.3f}s exceeds {args.max_seconds}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# tests/conftest.py
+#
+# The suite runs against in-memory SQLite and fakeredis; nothing needs a
+# MySQL or Redis server. Install with `pip install -r requirements-dev.txt`.
+
+import os
+
+# Config reads the environment at import, so set it before importing app
+os.environ["DATABASE_URI"] = "sqlite://"
+os.environ["AUTO_CREATE_TABLES"] = "1"
+os.environ["LOG_STARTUP_TIMINGS"] = "0"
+os.environ.pop("SOCKETIO_MESSAGE_QUEUE", None)
+
+from datetime import datetime, timedelta
+
+import fakeredis
+import jwt
+import pytest
+
+from app import create_app
+from app.extensions import db, redis_client, socketio
+from app.models import Chat, Strategy, User
+
+
+# one client for the whole run, like the real pooled one: Lua scripts
+# registered lazily by the services stay bound to it
+redis_client._client = fakeredis.FakeStrictRedis(decode_responses=True)
+
+
+@pytest.fixture
+def app():
+    redis_client.flushall()
+
+    app = create_app()
+    app.config["TESTING"] = True
+    app.config["RATE_LIMIT_ENABLED"] = False
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def users(app):
+    alice = User(name="alice", email="alice@example.com", password="x", is_verified=True)
+    bob = User(name="bob", email="bob@example.com", password="x", is_verified=True)
+    db.session.add_all([alice, bob])
+    db.session.commit()
+    return alice, bob
+
+
+@pytest.fixture
+def chat(app, users):
+    alice, bob = users
+    strategy = Strategy(name="momentum", owner_id=alice.id, status=1, published=1)
+    db.session.add(strategy)
+    db.session.commit()
+
+    chat = Chat(strategy_id=strategy.id, creator_id=alice.id, user_id=bob.id)
+    db.session.add(chat)
+    db.session.commit()
+    return chat
+
+
+def make_token(app, user_id):
+    return jwt.encode(
+        {"user_id": user_id, "exp": datetime.utcnow() + timedelta(hours=1)},
+        app.config["SECRET_KEY"],
+        algorithm="HS256"
+    )
+
+
+@pytest.fixture
+def auth_headers(app):
+    def headers(user):
+        return {"Authorization": f"Bearer {make_token(app, user.id)}"}
+    return headers
+
+
+@pytest.fixture
+def socket_client(app):
+    def connect(user, **query):
+        query_string = "&".join(
+            f"{k}={v}" for k, v in {"token": make_token(app, user.id), **query}.items()
+        )
+        return socketio.test_client(app, query_string=query_string)
+    return connect
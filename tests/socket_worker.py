@@ -0,0 +1,39 @@
+"""One app worker for test_multiworker.py, run as its own process.
+
+    python tests/socket_worker.py PORT [--seed]
+
+Reads DATABASE_URI, REDIS_HOST/REDIS_PORT and SOCKETIO_MESSAGE_QUEUE from
+the environment like a real worker. --seed adds two users and a chat
+between them and prints their ids as JSON before serving.
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.extensions import db, socketio  # noqa: E402
+from app.models import Chat, Strategy, User  # noqa: E402
+
+
+def seed():
+    alice = User(name="alice", email="alice@example.com", password="x")
+    bob = User(name="bob", email="bob@example.com", password="x")
+    db.session.add_all([alice, bob])
+    db.session.commit()
+    strategy = Strategy(name="momentum", owner_id=alice.id, status=1, published=1)
+    db.session.add(strategy)
+    db.session.commit()
+    chat = Chat(strategy_id=strategy.id, creator_id=alice.id, user_id=bob.id)
+    db.session.add(chat)
+    db.session.commit()
+    return {"chat_id": chat.id, "creator_id": alice.id, "user_id": bob.id}
+
+
+if __name__ == "__main__":
+    app = create_app()
+    if "--seed" in sys.argv:
+        with app.app_context():
+            print(json.dumps(seed()), flush=True)
+    socketio.run(app, host="127.0.0.1", port=int(sys.argv[1]), allow_unsafe_werkzeug=True)
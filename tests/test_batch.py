@@ -0,0 +1,68 @@
+import pytest
+
+from app.extensions import redis_client
+
+
+def _batch(client, headers, *requests, **options):
+    return client.post("/batch", json={"requests": list(requests), **options}, headers=headers)
+
+
+@pytest.mark.parametrize("path", ["/batch", "/batch?x=1", "/%62atch", "/%62%61tch"])
+def test_nested_batch_is_rejected(client, users, auth_headers, path):
+    response = _batch(client, auth_headers(users[0]), {"method": "POST", "path": path})
+
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Batches cannot be nested"
+
+
+def test_header_with_newline_is_rejected(client, chat, users, auth_headers):
+    response = _batch(client, auth_headers(users[0]), {
+        "method": "POST",
+        "path": f"/chat/{chat.id}/message",
+        "headers": {"Idempotency-Key": "abc\r\nX-Injected: 1"},
+        "body": {"content": "hi"}
+    })
+
+    assert response.status_code == 400
+    assert response.is_json
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_sub_requests_keep_client_address(app, client, users, auth_headers, parallel):
+    seen = []
+
+    @app.before_request
+    def record_origin():
+        from flask import request
+        seen.append((request.path, request.remote_addr, request.headers.get("X-Forwarded-For")))
+
+    response = client.post(
+        "/batch",
+        json={"parallel": parallel, "requests": [
+            {"method": "GET", "path": "/chat/profile"},
+            {"method": "GET", "path": "/chat/list"},
+        ]},
+        headers={**auth_headers(users[0]), "X-Forwarded-For": "203.0.113.9"},
+        environ_base={"REMOTE_ADDR": "198.51.100.7"}
+    )
+
+    assert response.status_code == 200
+    assert sorted(seen) == [
+        ("/batch", "198.51.100.7", "203.0.113.9"),
+        ("/chat/list", "198.51.100.7", "203.0.113.9"),
+        ("/chat/profile", "198.51.100.7", "203.0.113.9"),
+    ]
+
+
+def test_login_in_batch_is_limited_per_ip(app, client, users, auth_headers):
+    app.config["RATE_LIMIT_ENABLED"] = True
+
+    response = client.post(
+        "/batch",
+        json={"requests": [{"method": "POST", "path": "/auth/login", "body": {"password": "x"}}]},
+        headers=auth_headers(users[0]),
+        environ_base={"REMOTE_ADDR": "198.51.100.7"}
+    )
+
+    assert response.status_code == 200
+    assert redis_client.zcard("ratelimit:login:ip:198.51.100.7") == 1
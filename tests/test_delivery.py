@@ -0,0 +1,45 @@
+from app.models import Message
+
+
+def test_rest_send_with_same_key_returns_original(client, chat, users, auth_headers):
+    alice, _ = users
+    body = {"content": "hello", "client_msg_id": "msg-1"}
+
+    first = client.post(f"/chat/{chat.id}/message", json=body, headers=auth_headers(alice))
+    second = client.post(f"/chat/{chat.id}/message", json=body, headers=auth_headers(alice))
+
+    assert first.status_code == 201
+    assert second.status_code == 200
+    assert second.get_json()["data"] == first.get_json()["data"]
+    assert Message.query.count() == 1
+
+
+def test_rest_send_while_key_in_flight_is_409(client, chat, users, auth_headers):
+    from app.extensions import redis_client
+    from app.services.delivery_service import PENDING, idempotency_key
+
+    alice, _ = users
+    redis_client.set(idempotency_key(alice.id, "msg-1"), PENDING)
+
+    response = client.post(
+        f"/chat/{chat.id}/message",
+        json={"content": "hello"},
+        headers={**auth_headers(alice), "Idempotency-Key": "msg-1"}
+    )
+
+    assert response.status_code == 409
+    assert Message.query.count() == 0
+
+
+def test_socket_send_with_same_key_returns_original(chat, users, socket_client):
+    alice, _ = users
+    sock = socket_client(alice)
+    payload = {"chat_id": chat.id, "content": "hello", "client_msg_id": "msg-1"}
+
+    first = sock.emit("send_message", payload, callback=True)
+    second = sock.emit("send_message", payload, callback=True)
+
+    assert first["status"] == "success" and first["duplicate"] is False
+    assert second["status"] == "success" and second["duplicate"] is True
+    assert second["data"] == first["data"]
+    assert Message.query.count() == 1
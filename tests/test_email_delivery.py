@@ -0,0 +1,95 @@
+import smtplib
+from email.mime.text import MIMEText
+
+import pytest
+
+from app.services.email_service import EmailDeliveryWorker, SMTPConnectionPool
+
+
+class StubSMTP:
+    """Records sendmail calls; fails the sends listed in `failures`."""
+
+    def __init__(self, outbox, failures):
+        self.outbox = outbox
+        self.failures = failures
+        self.closed = False
+
+    def sendmail(self, from_addr, to_addr, body):
+        failure = self.failures.pop(0) if self.failures else None
+        if failure:
+            raise failure
+        self.outbox.append(to_addr)
+
+    def noop(self):
+        return (250, b"OK")
+
+    def quit(self):
+        self.closed = True
+
+    close = quit
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    state = {"outbox": [], "failures": [], "connections": []}
+
+    def connect(pool):
+        server = StubSMTP(state["outbox"], state["failures"])
+        state["connections"].append(server)
+        return server
+
+    monkeypatch.setattr(SMTPConnectionPool, "_connect", connect)
+    return state
+
+
+def _worker():
+    pool = SMTPConnectionPool("smtp.test", 25, size=2)
+    return EmailDeliveryWorker(pool, batch_size=10, max_retries=2, backoff=0)
+
+
+def _message(to_addr):
+    message = MIMEText("otp")
+    message["From"] = "noreply@example.com"
+    message["To"] = to_addr
+    return message
+
+
+def test_queued_messages_share_a_pooled_connection(smtp):
+    worker = _worker()
+    for n in range(3):
+        worker.enqueue(f"user{n}@example.com", _message(f"user{n}@example.com"))
+    worker.join()
+
+    assert sorted(smtp["outbox"]) == ["user0@example.com", "user1@example.com", "user2@example.com"]
+    assert worker.sent == 3
+    assert len(smtp["connections"]) == 1
+    assert worker.pool._idle.qsize() == 1
+
+
+def test_dropped_connection_is_retried_on_a_new_one(smtp):
+    smtp["failures"].append(smtplib.SMTPServerDisconnected("gone"))
+    worker = _worker()
+    worker.enqueue("a@example.com", _message("a@example.com"))
+    worker.join()
+
+    assert smtp["outbox"] == ["a@example.com"]
+    assert smtp["connections"][0].closed
+    assert len(smtp["connections"]) == 2
+
+
+def test_unexpected_error_releases_connection_and_keeps_worker_alive(smtp):
+    smtp["failures"].append(RuntimeError("boom"))
+    worker = _worker()
+    worker.enqueue("a@example.com", _message("a@example.com"))
+    worker.join()
+
+    # the connection that raised is closed, not pooled for the next send
+    assert smtp["connections"][0].closed
+    assert worker.pool._idle.qsize() == 0
+    assert worker.failed == 1
+
+    worker.enqueue("b@example.com", _message("b@example.com"))
+    worker.join()
+
+    assert smtp["outbox"] == ["b@example.com"]
+    assert worker._thread.is_alive()
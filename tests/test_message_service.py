@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+
+from app.extensions import db
+from app.models import Chat
+from app.services import message_service
+from app.services.message_service import GroupCommitter, _PendingWrite
+
+
+def _values(chat, sender, content):
+    return {
+        "chat_id": chat.id, "sender_id": sender.id, "receiver_id": chat.user_id,
+        "content": content, "created_at": datetime.utcnow()
+    }
+
+
+def _pointer(chat):
+    db.session.expire_all()
+    return db.session.get(Chat, chat.id).last_message_id
+
+
+def test_single_write_never_moves_pointer_back(app, chat, users):
+    newer = message_service._store_single(_values(chat, users[0], "newer"))
+    # a later-committing send of an older message
+    db.session.execute(db.update(Chat).where(Chat.id == chat.id).values(last_message_id=newer + 10))
+    db.session.commit()
+
+    message_service._store_single(_values(chat, users[0], "older"))
+
+    assert _pointer(chat) == newer + 10
+
+
+@pytest.mark.parametrize("start", [None, 0])
+def test_group_write_sets_pointer_when_empty_or_older(app, chat, users, start):
+    db.session.execute(db.update(Chat).where(Chat.id == chat.id).values(last_message_id=start))
+    db.session.commit()
+
+    ids = GroupCommitter()._write([
+        _PendingWrite(_values(chat, users[0], "a")),
+        _PendingWrite(_values(chat, users[0], "b"))
+    ])
+
+    assert _pointer(chat) == ids[-1]
+
+
+def test_group_write_never_moves_pointer_back(app, chat, users):
+    db.session.execute(db.update(Chat).where(Chat.id == chat.id).values(last_message_id=10_000))
+    db.session.commit()
+
+    GroupCommitter()._write([_PendingWrite(_values(chat, users[0], "late"))])
+
+    assert _pointer(chat) == 10_000
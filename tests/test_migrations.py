@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, text
+
+from app import migrations
+from app.extensions import db
+from app.models import Message
+from app.services.archive_service import archive_chat
+
+
+def _columns(table):
+    return {c["name"]: c for c in inspect(db.engine).get_columns(table)}
+
+
+def _indexes(table):
+    return {i["name"] for i in inspect(db.engine).get_indexes(table)}
+
+
+def test_create_all_records_every_migration(app):
+    # the app fixture boots with AUTO_CREATE_TABLES=1
+    assert migrations.applied_versions() == {version for version, _, _ in migrations.MIGRATIONS}
+    assert migrations.upgrade(log=lambda *_: None) == []
+
+
+def test_replaying_migrations_ends_at_the_model_schema(app):
+    with db.engine.begin() as conn:
+        conn.execute(text("DELETE FROM schema_migrations"))
+
+    applied = migrations.upgrade(log=lambda *_: None)
+
+    assert applied == [version for version, _, _ in migrations.MIGRATIONS]
+    assert "read_at" not in _columns("message")
+    assert not {"ix_message_receiver_read_chat", "ix_message_chat_read_at"} & _indexes("message")
+    assert migrations.upgrade(log=lambda *_: None) == []
+
+
+def test_replaying_step_6_keeps_live_watermarks(client, chat, users, auth_headers):
+    alice, bob = users
+    for n in range(3):
+        db.session.add(Message(chat_id=chat.id, sender_id=alice.id, receiver_id=bob.id, content=f"m{n}"))
+    db.session.commit()
+    assert client.put(f"/chat/{chat.id}/read", headers=auth_headers(bob)).status_code == 200
+
+    with db.engine.begin() as conn:
+        conn.execute(text("DELETE FROM schema_migrations WHERE version >= 6"))
+    migrations.upgrade(log=lambda *_: None)
+
+    with db.engine.connect() as conn:
+        user_read = conn.execute(
+            text("SELECT user_last_read_id FROM chats WHERE id = :id"), {"id": chat.id}
+        ).scalar()
+    assert user_read == 3
+
+
+def test_watermarks_backfill_from_legacy_read_flags(app, chat, users):
+    alice, bob = users
+    for n, is_read in enumerate([True, True, False, True]):
+        db.session.add(Message(
+            chat_id=chat.id, sender_id=alice.id, receiver_id=bob.id,
+            content=f"m{n}", is_read=is_read
+        ))
+    db.session.commit()
+    first_unread = Message.query.filter_by(is_read=False).one().id
+
+    # a chats table from before step 6
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_chats_creator_read_updated"))
+        conn.execute(text("DROP INDEX ix_chats_user_read_updated"))
+        for column in ("creator_last_read_id", "user_last_read_id", "read_updated_at"):
+            conn.execute(text(f"ALTER TABLE chats DROP COLUMN {column}"))
+        conn.execute(text("DELETE FROM schema_migrations WHERE version >= 6"))
+
+    migrations.upgrade(log=lambda *_: None)
+
+    columns = _columns("chats")
+    for name in ("creator_last_read_id", "user_last_read_id"):
+        assert columns[name]["nullable"] is False
+        assert str(columns[name]["default"]).strip("'") == "0"
+
+    with db.engine.connect() as conn:
+        user_read = conn.execute(
+            text("SELECT user_last_read_id FROM chats WHERE id = :id"), {"id": chat.id}
+        ).scalar()
+    assert user_read == first_unread - 1
+
+
+def test_archive_skips_messages_of_a_missing_chat(app):
+    assert archive_chat(12345, datetime.utcnow() + timedelta(days=1)) == 0
@@ -0,0 +1,120 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from fakeredis import TcpFakeServer
+
+from app.config import Config
+
+requests = pytest.importorskip("requests")
+socketio_client = pytest.importorskip("socketio")
+pytest.importorskip("websocket")
+
+WORKER = os.path.join(os.path.dirname(__file__), "socket_worker.py")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port, process, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(process.stderr.read())
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"worker on port {port} did not start")
+
+
+def _token(user_id):
+    return jwt.encode(
+        {"user_id": user_id, "exp": datetime.utcnow() + timedelta(hours=1)},
+        Config.SECRET_KEY,
+        algorithm="HS256"
+    )
+
+
+@pytest.fixture
+def shared_redis():
+    # one Redis endpoint, reachable over TCP by every worker process
+    server = TcpFakeServer(("127.0.0.1", 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def workers(tmp_path, shared_redis):
+    env = {
+        **os.environ,
+        "DATABASE_URI": f"sqlite:///{tmp_path / 'chat.db'}",
+        "AUTO_CREATE_TABLES": "1",
+        "REDIS_HOST": "127.0.0.1",
+        "REDIS_PORT": str(shared_redis),
+        "SOCKETIO_MESSAGE_QUEUE": f"redis://127.0.0.1:{shared_redis}/0",
+        "RATE_LIMIT_ENABLED": "0",
+    }
+    processes = []
+
+    def start(*args):
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, WORKER, str(port), *args], env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        processes.append(process)
+        return port, process
+
+    yield start
+
+    for process in processes:
+        process.kill()
+        process.wait()
+
+
+def test_message_reaches_socket_on_another_worker(workers):
+    port_a, worker_a = workers("--seed")
+    ids = next(json.loads(line) for line in worker_a.stdout if line.startswith("{"))
+    _wait_for_port(port_a, worker_a)
+    port_b, worker_b = workers()
+    _wait_for_port(port_b, worker_b)
+
+    received = threading.Event()
+    messages = []
+    bob = socketio_client.Client()
+
+    @bob.on("new_message")
+    def on_new_message(data):
+        messages.append(data)
+        received.set()
+
+    # bob's socket lives on worker A; alice sends through worker B
+    bob.connect(f"http://127.0.0.1:{port_a}?token={_token(ids['user_id'])}", wait_timeout=10)
+    try:
+        response = requests.post(
+            f"http://127.0.0.1:{port_b}/chat/{ids['chat_id']}/message",
+            json={"content": "hello from another worker"},
+            headers={"Authorization": f"Bearer {_token(ids['creator_id'])}"},
+            timeout=10
+        )
+        assert response.status_code == 201
+
+        assert received.wait(10)
+        assert messages[0]["content"] == "hello from another worker"
+        assert messages[0]["chat_id"] == ids["chat_id"]
+    finally:
+        bob.disconnect()
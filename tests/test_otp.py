@@ -0,0 +1,55 @@
+from app.config import Config
+from app.extensions import redis_client
+from app.services.otp_service import generate_and_store_otp, resend_otp_if_allowed, verify_otp
+
+EMAIL = "carol@example.com"
+
+
+def _wrong(otp):
+    return "000000" if otp != "000000" else "111111"
+
+
+def test_otp_is_consumed_on_success(app):
+    otp = generate_and_store_otp(EMAIL)
+
+    assert verify_otp(EMAIL, otp, count_attempt=True)
+    assert not verify_otp(EMAIL, otp, count_attempt=True)
+
+
+def test_max_attempts_are_allowed(app):
+    otp = generate_and_store_otp(EMAIL)
+    for _ in range(Config.OTP_MAX_ATTEMPTS):
+        assert not verify_otp(EMAIL, _wrong(otp), count_attempt=True)
+
+    assert verify_otp(EMAIL, otp, count_attempt=True)
+
+
+def test_one_more_failure_locks_the_otp_out(app):
+    otp = generate_and_store_otp(EMAIL)
+    for _ in range(Config.OTP_MAX_ATTEMPTS + 1):
+        assert not verify_otp(EMAIL, _wrong(otp), count_attempt=True)
+
+    assert not redis_client.exists(f"otp:{EMAIL}", f"otp_attempts:{EMAIL}")
+    assert not verify_otp(EMAIL, otp, count_attempt=True)
+
+
+def test_resend_is_refused_while_locked(app):
+    otp = generate_and_store_otp(EMAIL)
+
+    assert resend_otp_if_allowed(EMAIL) is None
+    # the refused resend left the current OTP and its attempts alone
+    assert verify_otp(EMAIL, otp, count_attempt=True)
+
+
+def test_resend_replaces_the_otp_once_the_lock_expires(app):
+    otp = generate_and_store_otp(EMAIL)
+    assert not verify_otp(EMAIL, _wrong(otp), count_attempt=True)
+    redis_client.delete(f"otp_resend_lock:{EMAIL}")
+
+    resent = resend_otp_if_allowed(EMAIL)
+
+    assert resent is not None
+    assert redis_client.ttl(f"otp_resend_lock:{EMAIL}") > 0
+    assert redis_client.get(f"otp_attempts:{EMAIL}") == "0"
+    assert resend_otp_if_allowed(EMAIL) is None
+    assert verify_otp(EMAIL, resent, count_attempt=True)
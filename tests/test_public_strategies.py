@@ -0,0 +1,47 @@
+from app.extensions import db, redis_client
+from app.models import Strategy
+from app.services.strategy_service import (
+    invalidate_public_strategies,
+    public_cache_generation,
+    public_cache_key,
+    set_cached_public_page
+)
+
+
+def _publish(owner, *names):
+    db.session.add_all([Strategy(name=name, owner_id=owner.id, status=1, published=1) for name in names])
+    db.session.commit()
+
+
+def test_page_and_per_page_are_clamped(app, client, users):
+    _publish(users[0], "a")
+
+    response = client.get("/strategy/public", query_string={"page": -3, "per_page": 10**6})
+
+    assert response.status_code == 200
+    assert [s["name"] for s in response.get_json()["data"]] == ["a"]
+    generation = public_cache_generation()
+    max_per_page = app.config["PUBLIC_STRATEGIES_MAX_PAGE_SIZE"]
+    assert redis_client.keys("public_strategies:*:*:*") == [public_cache_key(generation, 1, max_per_page)]
+
+
+def test_etag_revalidation(client, users):
+    _publish(users[0], "a")
+    first = client.get("/strategy/public")
+
+    second = client.get("/strategy/public", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 304
+
+
+def test_fill_started_before_invalidation_is_not_served(client, users):
+    _publish(users[0], "a")
+    generation = public_cache_generation()
+
+    # a request read the generation and queried; then a strategy changed
+    _publish(users[0], "b")
+    invalidate_public_strategies()
+    set_cached_public_page(generation, 1, 10, "stale", '{"success": true, "data": []}')
+
+    names = [s["name"] for s in client.get("/strategy/public").get_json()["data"]]
+    assert names == ["a", "b"]
@@ -0,0 +1,25 @@
+from sqlalchemy.dialects import mysql
+
+from app.utils import query_plans
+
+
+def test_hot_queries_use_indexes_on_sqlite(app):
+    results = query_plans.check_hot_queries()
+
+    assert results
+    assert [route for route, uses_index, _ in results if not uses_index] == []
+
+
+def test_hot_queries_render_for_mysql(app):
+    for route, query in query_plans.hot_queries():
+        statement = getattr(query, "statement", query)
+        assert statement.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}), route
+
+
+def test_unsupported_dialect_is_skipped(app, monkeypatch):
+    monkeypatch.setattr(query_plans, "SUPPORTED_DIALECTS", ())
+
+    result = app.test_cli_runner().invoke(args=["check-indexes"])
+
+    assert result.exit_code == 0
+    assert "skipped" in result.output
@@ -0,0 +1,83 @@
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.extensions import redis_client
+from app.utils.rate_limit import LocalWindows
+
+
+@pytest.fixture
+def limits(app):
+    app.config["RATE_LIMIT_ENABLED"] = True
+    app.config["RATE_LIMITS"] = {**app.config["RATE_LIMITS"], "login:ip": "3/60", "login:email": "1/60"}
+
+
+def _login(client, email, remote_addr="198.51.100.7"):
+    return client.post(
+        "/auth/login",
+        json={"email": email, "password": "wrong"},
+        environ_base={"REMOTE_ADDR": remote_addr}
+    )
+
+
+def test_denied_request_records_no_hits(client, users, limits):
+    assert _login(client, "alice@example.com").status_code == 401
+    denied = _login(client, "alice@example.com")
+
+    assert denied.status_code == 429
+    assert int(denied.headers["Retry-After"]) >= 1
+    # the email window denied it, so the IP window was left alone
+    assert redis_client.zcard("ratelimit:login:ip:198.51.100.7") == 1
+    assert _login(client, "bob@example.com").status_code == 401
+
+
+def test_missing_remote_addr_shares_one_window(client, users, limits):
+    for email in ("a@example.com", "b@example.com", "c@example.com"):
+        assert _login(client, email, remote_addr="").status_code == 401
+
+    assert _login(client, "d@example.com", remote_addr="").status_code == 429
+    assert redis_client.zcard("ratelimit:login:ip:unknown") == 3
+
+
+def test_local_windows_record_only_when_all_allow():
+    windows = LocalWindows()
+
+    assert windows.hit([("email", 1, 60), ("ip", 5, 60)]) == (True, 0.0)
+    allowed, retry_after = windows.hit([("email", 1, 60), ("ip", 5, 60)])
+
+    assert not allowed and 0 < retry_after <= 60
+    assert len(windows._windows["ip"]) == 1
+
+
+def test_falls_back_to_local_windows_without_redis(client, users, limits, monkeypatch):
+    import redis
+    from app.utils import rate_limit
+
+    def unavailable(**kwargs):
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(rate_limit, "_script", unavailable)
+    monkeypatch.setattr(rate_limit, "local_windows", LocalWindows())
+
+    assert _login(client, "alice@example.com").status_code == 401
+    assert _login(client, "alice@example.com").status_code == 429
+
+
+def test_trusted_proxy_gives_each_client_its_own_window(app, monkeypatch):
+    monkeypatch.setattr(Config, "TRUSTED_PROXY_HOPS", 1)
+    proxied = create_app()
+    proxied.config["RATE_LIMIT_ENABLED"] = True
+    proxied.config["RATE_LIMITS"] = {**proxied.config["RATE_LIMITS"], "login:ip": "1/60"}
+    client = proxied.test_client()
+
+    for n, forwarded_for in enumerate(("203.0.113.1", "203.0.113.2")):
+        response = client.post(
+            "/auth/login",
+            json={"email": f"{n}@example.com", "password": "wrong"},
+            headers={"X-Forwarded-For": forwarded_for},
+            environ_base={"REMOTE_ADDR": "10.0.0.1"}
+        )
+        assert response.status_code == 401
+
+    assert redis_client.zcard("ratelimit:login:ip:203.0.113.1") == 1
+    assert redis_client.zcard("ratelimit:login:ip:10.0.0.1") == 0
@@ -0,0 +1,23 @@
+from app.extensions import db
+from app.models import Chat, Message
+
+
+def _send(chat, sender, receiver, count):
+    for n in range(count):
+        db.session.add(Message(chat_id=chat.id, sender_id=sender.id, receiver_id=receiver.id, content=f"m{n}"))
+    db.session.commit()
+
+
+def test_reading_a_chat_keeps_its_inbox_position(client, chat, users, auth_headers):
+    alice, bob = users
+    _send(chat, alice, bob, 3)
+    updated_at = db.session.get(Chat, chat.id).updated_at
+    db.session.expire_all()
+
+    assert client.put(f"/chat/{chat.id}/read", headers=auth_headers(bob)).status_code == 200
+
+    db.session.expire_all()
+    chat = db.session.get(Chat, chat.id)
+    assert chat.user_last_read_id == 3
+    assert chat.read_updated_at is not None
+    assert chat.updated_at == updated_at
@@ -0,0 +1,47 @@
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
+
+from app.extensions import db
+from app.models import MessageTerm
+
+
+def _send(client, chat, user, auth_headers, content):
+    response = client.post(f"/chat/{chat.id}/message", json={"content": content}, headers=auth_headers(user))
+    assert response.status_code == 201
+    return response.get_json()["data"]["message_id"]
+
+
+def _search(client, user, auth_headers, q):
+    response = client.get("/chat/search", query_string={"q": q}, headers=auth_headers(user))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_term_is_binary_on_mysql():
+    ddl = str(CreateTable(MessageTerm.__table__).compile(dialect=mysql.dialect()))
+    assert "COLLATE utf8mb4_bin" in ddl
+
+
+def test_accent_and_case_variants_index_in_one_message(client, chat, users, auth_headers):
+    message_id = _send(client, chat, users[0], auth_headers, "Resume résumé RESUME")
+
+    terms = {t for (t,) in db.session.query(MessageTerm.term).filter_by(message_id=message_id)}
+    assert terms == {"resume", "résumé"}
+
+
+def test_more_matched_terms_rank_first(client, chat, users, auth_headers):
+    alice, bob = users
+    both = _send(client, chat, alice, auth_headers, "momentum breakout today")
+    one = _send(client, chat, alice, auth_headers, "momentum only")
+
+    results = _search(client, bob, auth_headers, "momentum breakout")["data"]
+    assert [m["id"] for m in results][:2] == [both, one]
+
+
+def test_ranking_scans_only_newest_postings(app, client, chat, users, auth_headers):
+    app.config["SEARCH_MAX_POSTINGS"] = 2
+    alice, bob = users
+    ids = [_send(client, chat, alice, auth_headers, f"signal {n}") for n in range(4)]
+
+    results = _search(client, bob, auth_headers, "signal")["data"]
+    assert [m["id"] for m in results] == ids[:1:-1]
@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# generous for a cold interpreter on a loaded CI box; benchmarks/startup.py
+# is the place for tighter numbers
+MAX_STARTUP_SECONDS = float(os.getenv("MAX_STARTUP_SECONDS", 3.0))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+done = time.perf_counter()
+
+from app.extensions import redis_client
+print(json.dumps({
+    "total_s": done - started,
+    "create_app_s": done - imported,
+    "phases_ms": flask_app.config["STARTUP_TIMINGS"],
+    "redis_built": redis_client._client is not None
+}))
+"""
+
+
+def _cold_start(tmp_path):
+    env = {
+        key: value for key, value in os.environ.items()
+        if key not in ("AUTO_CREATE_TABLES", "LOG_STARTUP_TIMINGS", "SOCKETIO_MESSAGE_QUEUE")
+    }
+    # a database that cannot be opened: startup must not touch it
+    env["DATABASE_URI"] = f"sqlite:///{tmp_path / 'missing' / 'app.db'}"
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=60, check=True
+    )
+    return result.stdout
+
+
+def test_cold_start_is_bounded_and_lazy(tmp_path):
+    output = _cold_start(tmp_path)
+    report = json.loads(output.strip().splitlines()[-1])
+
+    assert report["total_s"] < MAX_STARTUP_SECONDS, report
+    assert "create_all" not in report["phases_ms"]
+    assert not report["redis_built"]
+
+
+def test_startup_is_quiet_by_default(tmp_path):
+    output = _cold_start(tmp_path)
+
+    assert "⏱" not in output
+    assert "Tables created" not in output
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.extensions import socketio
+from app.services import strategy_events
+from app.services.strategy_events import (
+    DELETED,
+    PUBLIC_ROOM,
+    UPDATED,
+    CoalescingBroadcaster,
+    owner_room,
+    publish_strategy_event,
+    strategy_room
+)
+
+
+@pytest.fixture
+def emitted(monkeypatch):
+    sent = []
+    monkeypatch.setattr(socketio, "emit", lambda event, payload, to: sent.append((event, payload, to)))
+    return sent
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    """A windowed broadcaster whose timed flush never runs: tests flush()."""
+    scheduled = []
+    monkeypatch.setattr(socketio, "start_background_task", scheduled.append)
+    broadcaster = CoalescingBroadcaster(window=60)
+    broadcaster.scheduled = scheduled
+    monkeypatch.setattr(strategy_events, "get_broadcaster", lambda: broadcaster)
+    return broadcaster
+
+
+def _strategy(status=1, published=1):
+    return SimpleNamespace(id=5, owner_id=9, status=status, published=published)
+
+
+def test_zero_window_emits_immediately(emitted):
+    CoalescingBroadcaster(window=0).publish(UPDATED, 5, {"id": 5, "name": "a"}, {"strategy_5"})
+
+    assert emitted == [(UPDATED, {"id": 5, "name": "a"}, ["strategy_5"])]
+
+
+def test_updates_within_a_window_merge_into_one_emit(emitted, broadcaster):
+    broadcaster.publish(UPDATED, 5, {"id": 5, "name": "a"}, {"strategy_5"})
+    broadcaster.publish(UPDATED, 5, {"id": 5, "capital_required": 10}, {"strategy_5"})
+    broadcaster.publish(UPDATED, 6, {"id": 6, "name": "b"}, {"strategy_6"})
+    assert emitted == []
+    assert len(broadcaster.scheduled) == 1
+
+    broadcaster.flush()
+
+    assert emitted == [
+        (UPDATED, {"id": 5, "name": "a", "capital_required": 10}, ["strategy_5"]),
+        (UPDATED, {"id": 6, "name": "b"}, ["strategy_6"]),
+    ]
+    assert broadcaster.coalesced == 1
+
+    # the next event opens a new window
+    broadcaster.publish(UPDATED, 5, {"id": 5, "name": "c"}, {"strategy_5"})
+    assert len(broadcaster.scheduled) == 2
+
+
+def test_delete_replaces_pending_updates(emitted, broadcaster):
+    broadcaster.publish(UPDATED, 5, {"id": 5, "name": "a"}, {"strategy_5"})
+    broadcaster.publish(DELETED, 5, {"id": 5}, {"strategy_5"})
+    broadcaster.publish(UPDATED, 5, {"id": 5, "name": "late"}, {"strategy_5"})
+
+    broadcaster.flush()
+
+    assert emitted == [(DELETED, {"id": 5}, ["strategy_5"])]
+
+
+def test_rooms_widen_across_merged_events(emitted, broadcaster):
+    broadcaster.publish(UPDATED, 5, {"id": 5}, {"strategy_5"})
+    broadcaster.publish(UPDATED, 5, {"id": 5}, {"strategies_owner_9", PUBLIC_ROOM})
+
+    broadcaster.flush()
+
+    assert len(emitted) == 1
+    assert emitted[0][2] == sorted({"strategy_5", "strategies_owner_9", PUBLIC_ROOM})
+
+
+def test_public_feed_hears_a_strategy_leave_it(emitted, broadcaster):
+    publish_strategy_event(UPDATED, _strategy(published=0), {"published": 0}, was_public=True)
+    publish_strategy_event(UPDATED, _strategy(status=0, published=0), {"status": 0}, was_public=False)
+
+    broadcaster.flush()
+
+    assert emitted == [(
+        UPDATED,
+        {"id": 5, "published": 0, "status": 0},
+        sorted({strategy_room(5), owner_room(9), PUBLIC_ROOM})
+    )]
+
+
+def test_private_strategy_stays_out_of_the_public_feed(emitted, broadcaster):
+    publish_strategy_event(UPDATED, _strategy(published=0), {"name": "x"})
+    broadcaster.flush()
+
+    assert emitted[0][2] == sorted({strategy_room(5), owner_room(9)})
@@ -0,0 +1,66 @@
+from app.extensions import db, redis_client
+from app.models import Strategy
+from app.services import strategy_service
+from app.services.strategy_service import (
+    get_strategy_by_serial,
+    invalidate_strategy_ids,
+    strategy_ids_key,
+    strategy_ids_version_key
+)
+
+
+def _strategies(owner, count):
+    strategies = [Strategy(name=f"s{n}", owner_id=owner.id) for n in range(count)]
+    db.session.add_all(strategies)
+    db.session.commit()
+    return strategies
+
+
+def test_fill_does_not_overwrite_a_concurrent_invalidate(app, users):
+    owner = users[0]
+    stale = [s.id for s in _strategies(owner, 2)]
+
+    # a fill read the version, then the DB; a create invalidated meanwhile
+    version = redis_client.get(strategy_ids_version_key(owner.id))
+    invalidate_strategy_ids(owner.id)
+
+    assert not strategy_service._store_strategy_ids(owner.id, stale, version)
+    assert not redis_client.exists(strategy_ids_key(owner.id))
+
+
+def test_fill_caches_ids_when_nothing_changed(app, users):
+    owner = users[0]
+    strategies = _strategies(owner, 3)
+
+    assert get_strategy_by_serial(owner.id, 2).id == strategies[1].id
+    assert redis_client.lrange(strategy_ids_key(owner.id), 0, -1) == [str(s.id) for s in strategies]
+
+
+def test_deleted_id_in_the_cached_list_is_resolved_again(app, users):
+    owner = users[0]
+    first, second = _strategies(owner, 2)
+    # a cached list whose invalidation was lost: a deleted strategy in front
+    redis_client.rpush(strategy_ids_key(owner.id), first.id - 100, first.id, second.id)
+
+    assert get_strategy_by_serial(owner.id, 1).id == first.id
+    assert redis_client.lrange(strategy_ids_key(owner.id), 0, -1) == [str(first.id), str(second.id)]
+
+
+def test_private_page_size_is_capped(client, users, auth_headers):
+    owner = users[0]
+    _strategies(owner, 3)
+
+    response = client.get("/strategy/private?page=1&per_page=100000", headers=auth_headers(owner))
+
+    max_page_size = client.application.config["PRIVATE_STRATEGIES_MAX_PAGE_SIZE"]
+    assert response.json["paging"]["per_page"] == max_page_size
+    assert len(response.json["data"]) == 3
+
+
+def test_other_owners_strategy_is_never_returned(app, users):
+    owner, other = users
+    mine = _strategies(owner, 1)[0]
+    theirs = _strategies(other, 1)[0]
+    redis_client.rpush(strategy_ids_key(owner.id), theirs.id)
+
+    assert get_strategy_by_serial(owner.id, 1).id == mine.id
@@ -0,0 +1,26 @@
+import base64
+import json
+
+import pytest
+
+from app.services.sync_service import decode_cursor
+
+
+def _cursor(t, message_id=0):
+    raw = json.dumps({"t": t, "id": message_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def test_cursor_with_utc_offset_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(_cursor("2026-10-17T00:00:00+00:00"))
+
+
+def test_sync_answers_400_for_an_aware_cursor(client, users, auth_headers):
+    response = client.get(
+        "/chat/sync", query_string={"since": _cursor("2026-10-17T00:00:00+00:00")},
+        headers=auth_headers(users[0])
+    )
+
+    assert response.status_code == 400
+    assert response.json["status"] == "error"
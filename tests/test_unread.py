@@ -0,0 +1,91 @@
+import redis
+
+from app.extensions import db, redis_client
+from app.models import Message
+from app.services import read_service, unread_service
+from app.services.read_service import mark_chats_read
+from app.services.unread_service import (
+    BUILT_FIELD,
+    get_unread_counts,
+    increment_unread,
+    unread_key
+)
+
+
+def _receive(chat, users):
+    alice, bob = users
+    message = Message(chat_id=chat.id, sender_id=alice.id, receiver_id=bob.id, content="hi")
+    db.session.add(message)
+    db.session.commit()
+    increment_unread(bob.id, chat.id)
+
+
+def test_counts_rebuild_from_db(app, chat, users):
+    _receive(chat, users)
+    redis_client.delete(unread_key(users[1].id))
+
+    assert get_unread_counts(users[1].id) == {chat.id: 1}
+    assert redis_client.hget(unread_key(users[1].id), BUILT_FIELD) == "1"
+
+
+def test_increment_during_rebuild_is_not_lost(app, chat, users, monkeypatch):
+    bob = users[1]
+    _receive(chat, users)
+    redis_client.delete(unread_key(bob.id))
+    count_from_db = unread_service.count_unread_from_db
+
+    def count_then_receive(user_id):
+        counts = count_from_db(user_id)
+        # a send commits and bumps the counter after the DB was counted
+        _receive(chat, users)
+        return counts
+
+    monkeypatch.setattr(unread_service, "count_unread_from_db", count_then_receive)
+    get_unread_counts(bob.id)
+    monkeypatch.setattr(unread_service, "count_unread_from_db", count_from_db)
+
+    assert get_unread_counts(bob.id) == {chat.id: 2}
+
+
+def test_failed_increment_forces_a_rebuild(app, chat, users, monkeypatch):
+    bob = users[1]
+    get_unread_counts(bob.id)
+
+    def unavailable():
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(redis_client, "pipeline", unavailable, raising=False)
+    _receive(chat, users)
+    monkeypatch.undo()
+
+    assert redis_client.hget(unread_key(bob.id), BUILT_FIELD) is None
+    assert get_unread_counts(bob.id) == {chat.id: 1}
+
+
+def test_reading_keeps_hash_built(app, chat, users):
+    bob = users[1]
+    _receive(chat, users)
+    get_unread_counts(bob.id)
+    mark_chats_read(bob.id)
+
+    assert get_unread_counts(bob.id) == {}
+    assert redis_client.hget(unread_key(bob.id), BUILT_FIELD) == "1"
+
+
+def test_message_sent_while_reading_stays_unread(app, chat, users, monkeypatch):
+    bob = users[1]
+    _receive(chat, users)
+    get_unread_counts(bob.id)
+    subtract_unread = read_service.subtract_unread
+
+    def receive_then_subtract(user_id, counts):
+        # a send commits and bumps the counter after the watermark moved
+        _receive(chat, users)
+        subtract_unread(user_id, counts)
+
+    monkeypatch.setattr(read_service, "subtract_unread", receive_then_subtract)
+
+    for chat_ids in ([chat.id], None):
+        mark_chats_read(bob.id, chat_ids)
+        assert get_unread_counts(bob.id) == {chat.id: 1}
+        assert redis_client.hget(unread_key(bob.id), BUILT_FIELD) == "1"